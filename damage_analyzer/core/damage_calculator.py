@@ -21,6 +21,12 @@
 import math
 from typing import Dict, List, Tuple, Optional, Any
 
+import numpy as np
+
+# 攻击类型取值（支持简写和完整格式），使用frozenset以便常数时间查找
+PHYSICAL_ATTACK_TYPES = frozenset({'物伤', '物理伤害'})
+MAGICAL_ATTACK_TYPES = frozenset({'法伤', '法术伤害'})
+
 class DamageCalculator:
     """
     明日方舟伤害计算引擎
@@ -178,9 +184,9 @@ class DamageCalculator:
             不支持的攻击类型将返回0
         """
         # 根据攻击类型分发到对应的计算方法 - 支持简写和完整格式
-        if atk_type in ['物伤', '物理伤害']:
+        if atk_type in PHYSICAL_ATTACK_TYPES:
             return self.calculate_physical_damage(atk, defense, hit_count)
-        elif atk_type in ['法伤', '法术伤害']:
+        elif atk_type in MAGICAL_ATTACK_TYPES:
             return self.calculate_magical_damage(atk, magic_resist, hit_count)
         else:
             # 未知攻击类型，返回0并可能需要记录警告
@@ -342,6 +348,131 @@ class DamageCalculator:
         
         return results
 
+    def calculate_partial(self, operator_data: Dict[str, Any], metrics, enemy_def: int = 0, enemy_mdef: float = 0) -> Dict[str, float]:
+        """
+        只计算指定的性能指标
+        
+        与calculate_operator_performance使用相同的公式和默认值，但只计算
+        metrics中列出的指标及其依赖项，供表单单个字段变化时局部刷新使用。
+        
+        Args:
+            operator_data (Dict[str, Any]): 干员数据字典
+            metrics: 需要计算的指标键集合（取值同calculate_operator_performance的返回键）
+            enemy_def (int, optional): 敌人防御力. Defaults to 0.
+            enemy_mdef (float, optional): 敌人法抗. Defaults to 0.
+        
+        Returns:
+            Dict[str, float]: 只包含所请求指标的字典
+        """
+        results = {}
+        
+        atk = operator_data.get('atk', 0) or 0
+        atk_speed = operator_data.get('atk_speed', 1.0) or 1.0
+        hit_count = operator_data.get('hit_count', 1.0) or 1.0
+        
+        # DPH是DPS和性价比的依赖项
+        if metrics & {'dph', 'dps', 'cost_efficiency'}:
+            atk_type = operator_data.get('atk_type', '物伤')
+            dph = self.calculate_dph(atk, atk_type, enemy_def, enemy_mdef, hit_count)
+            dps = self.calculate_dps(dph, atk_speed)
+            if 'dph' in metrics:
+                results['dph'] = dph
+            if 'dps' in metrics:
+                results['dps'] = dps
+            if 'cost_efficiency' in metrics:
+                cost = operator_data.get('cost', 1) or 1
+                results['cost_efficiency'] = dps / max(cost, 1)
+        
+        if 'armor_break_point' in metrics:
+            results['armor_break_point'] = self.find_armor_break_point(atk)
+        
+        if metrics & {'hps', 'hph'}:
+            hps = hph = 0.0
+            heal_amount = operator_data.get('heal_amount', 0) or 0
+            if operator_data.get('class_type', '') == '医疗' and heal_amount > 0:
+                hps = heal_amount * atk_speed
+                hph = heal_amount * hit_count
+            if 'hps' in metrics:
+                results['hps'] = hps
+            if 'hph' in metrics:
+                results['hph'] = hph
+        
+        if 'survivability' in metrics:
+            hp = operator_data.get('hp', 0) or 0
+            defense = operator_data.get('def', 0) or 0
+            results['survivability'] = hp * (1 + defense / 100)
+        
+        return results
+    
+    def calculate_batch(self, operators: List[Dict[str, Any]], enemy_def: int = 0, enemy_mdef: float = 0) -> Dict[str, np.ndarray]:
+        """
+        批量计算多个干员的性能指标（向量化）
+        
+        与calculate_operator_performance使用相同的公式和默认值，但先将干员数据
+        按字段整理为NumPy数组，再对所有干员一次性完成计算，避免逐个干员的
+        Python函数调用开销。
+        
+        Args:
+            operators (List[Dict[str, Any]]): 干员数据字典列表
+            enemy_def (int, optional): 敌人防御力. Defaults to 0.
+            enemy_mdef (float, optional): 敌人法抗. Defaults to 0.
+        
+        Returns:
+            Dict[str, np.ndarray]: 指标名 -> 按干员顺序排列的数组，
+                包含dph、dps、armor_break_point、cost_efficiency、hps、hph、survivability
+        """
+        count = len(operators)
+        
+        def column(key: str, default: float) -> np.ndarray:
+            # 与单个计算保持一致：缺失值和0值都使用默认值
+            return np.fromiter(((op.get(key, default) or default) for op in operators),
+                               dtype=np.float64, count=count)
+        
+        atk = column('atk', 0)
+        atk_speed = column('atk_speed', 1.0)
+        hit_count = column('hit_count', 1.0)
+        cost = column('cost', 1)
+        heal_amount = column('heal_amount', 0)
+        hp = column('hp', 0)
+        defense = column('def', 0)
+        
+        atk_types = [op.get('atk_type', '物伤') for op in operators]
+        is_physical = np.fromiter((t in PHYSICAL_ATTACK_TYPES for t in atk_types), dtype=bool, count=count)
+        is_magical = np.fromiter((t in MAGICAL_ATTACK_TYPES for t in atk_types), dtype=bool, count=count)
+        is_medic = np.fromiter((op.get('class_type', '') == '医疗' for op in operators), dtype=bool, count=count)
+        
+        # 保底伤害
+        min_damage = atk * self.min_damage_rate
+        
+        # 物理伤害：max(攻击力-防御力, 保底伤害)
+        physical = np.maximum(atk - enemy_def, min_damage)
+        
+        # 法术伤害：攻击力×(1-法抗%)，不低于保底伤害；法抗≥100%时直接为保底伤害
+        resist_rate = enemy_mdef / 100.0
+        if resist_rate >= 1.0:
+            magical = min_damage
+        else:
+            magical = np.maximum(atk * (1 - resist_rate), min_damage)
+        
+        # 每次攻击伤害：乘以打数，攻击力非正或未知攻击类型时为0
+        dph = np.where(is_physical, physical, np.where(is_magical, magical, 0.0)) * hit_count
+        dph = np.where(atk > 0, np.maximum(dph, 0.0), 0.0)
+        
+        dps = np.where(atk_speed > 0, dph * atk_speed, 0.0)
+        
+        # 医疗干员的治疗指标
+        heals = is_medic & (heal_amount > 0)
+        
+        return {
+            'dph': dph,
+            'dps': dps,
+            'armor_break_point': np.trunc(atk * 0.95).astype(np.int64),
+            'cost_efficiency': dps / np.maximum(cost, 1),
+            'hps': np.where(heals, heal_amount * atk_speed, 0.0),
+            'hph': np.where(heals, heal_amount * hit_count, 0.0),
+            'survivability': hp * (1 + defense / 100)
+        }
+
     def calculate_cumulative_damage(self, operator_data: Dict[str, Any], time_seconds: float, enemy_def: int = 0, enemy_mdef: float = 0) -> float:
         """
         计算指定时间点的累计伤害
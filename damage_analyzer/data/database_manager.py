@@ -9,7 +9,7 @@
 import sqlite3
 import os
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Any
 import logging
 
@@ -27,6 +27,8 @@ class DatabaseManager:
             db_path = os.path.join(analyzer_dir, 'damage_analyzer.db')
         
         self.db_path = db_path
+        self._data_version = 0  # 干员数据版本号，每次修改干员表后递增
+        self._records_version = 0  # 计算/导入记录版本号，每次写入或清理记录后递增
         self.initialize_database()  # 初始化数据库表结构
     
     def get_connection(self):
@@ -47,6 +49,28 @@ class DatabaseManager:
         conn.row_factory = sqlite3.Row  # 查询结果可通过列名访问
         return conn
     
+    def get_data_version(self) -> int:
+        """获取干员数据版本号
+        
+        每次通过本管理器插入、更新、删除或重排干员后版本号都会递增，
+        界面可以据此判断缓存的干员列表是否需要重新查询。
+        
+        Returns:
+            int: 当前数据版本号
+        """
+        return self._data_version
+    
+    def get_records_version(self) -> int:
+        """获取计算记录和导入记录的版本号
+        
+        每次通过本管理器记录计算、记录导入或清理旧记录后版本号都会递增，
+        与get_data_version一起可判断缓存的统计和报告数据是否仍是最新。
+        
+        Returns:
+            int: 当前记录版本号
+        """
+        return self._records_version
+    
     def initialize_database(self):
         """初始化数据库表结构 - 修复版本
         
@@ -106,6 +130,12 @@ class DatabaseManager:
             )
         ''')
         
+        # 按时间查询计算记录（今日计数、最近记录）使用的索引
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_calculation_records_created_at
+            ON calculation_records (created_at)
+        ''')
+        
         # 检查并添加缺失的列（兼容旧数据库）
         self._ensure_database_compatibility(cursor)
         
@@ -212,6 +242,7 @@ class DatabaseManager:
             ))
             
             conn.commit()
+            self._data_version += 1
             
             logger.info(f"成功插入干员 {safe_data['name']} (智能分配ID: {next_id})")
             return next_id
@@ -261,6 +292,80 @@ class DatabaseManager:
             cursor.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM operators')
             return cursor.fetchone()[0]
     
+    def bulk_insert_operators(self, operators: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """批量插入干员数据
+        
+        此方法在一个事务中用executemany一次插入所有干员，ID分配规则
+        与insert_operator相同（优先补位）。名称已存在或在本批中重复的
+        干员会被跳过。
+        
+        Args:
+            operators: 干员信息字典列表
+        Returns:
+            Dict[str, Any]: 包含插入数量和跳过名称的结果字典
+        Raises:
+            Exception: 插入失败时抛出
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('SELECT id, name FROM operators ORDER BY id ASC')
+            existing = cursor.fetchall()
+            used_ids = {row['id'] for row in existing}
+            used_names = {row['name'] for row in existing}
+            
+            rows = []
+            skipped = []
+            next_id = 1
+            for operator_data in operators:
+                name = operator_data.get('name', '')
+                if not name or name in used_names:
+                    skipped.append(name)
+                    continue
+                used_names.add(name)
+                
+                # 智能ID分配：依次取最小的可用ID
+                while next_id in used_ids:
+                    next_id += 1
+                used_ids.add(next_id)
+                
+                rows.append((
+                    next_id,
+                    name,
+                    operator_data.get('class_type', '未知'),
+                    operator_data.get('hp', 0) or 0,
+                    operator_data.get('atk', 0) or 0,
+                    operator_data.get('def', 0) or 0,
+                    operator_data.get('mdef', 0) or 0,
+                    operator_data.get('atk_speed', 1.0) or 1.0,
+                    operator_data.get('atk_type', '物伤') or '物伤',
+                    operator_data.get('block_count', 1) or 1,
+                    operator_data.get('cost', 10) or 10
+                ))
+            
+            cursor.executemany('''
+                INSERT INTO operators (id, name, class_type, hp, atk, def, mdef, 
+                                     atk_speed, atk_type, block_count, cost,
+                                     created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 
+                        datetime('now','localtime'), datetime('now','localtime'))
+            ''', rows)
+            
+            conn.commit()
+            if rows:
+                self._data_version += 1
+            
+            logger.info(f"批量插入干员 {len(rows)} 个，跳过 {len(skipped)} 个")
+            return {'inserted': len(rows), 'skipped': skipped}
+            
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"批量插入干员失败: {e}")
+            raise e
+        finally:
+            conn.close()
+    
     def get_operator(self, operator_id: int) -> Optional[Dict[str, Any]]:
         """根据ID获取干员
         
@@ -319,6 +424,23 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    def count_operators(self) -> int:
+        """获取干员数量
+        
+        只执行COUNT查询，不读取干员数据。
+        
+        Returns:
+            int: 干员总数
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('SELECT COUNT(*) FROM operators')
+            return cursor.fetchone()[0]
+        finally:
+            conn.close()
+    
     def update_operator(self, operator_id: int, operator_data: Dict[str, Any]) -> bool:
         """更新干员数据 - 修复版本
         
@@ -390,6 +512,7 @@ class DatabaseManager:
             conn.commit()
             
             if success:
+                self._data_version += 1
                 logger.info(f"成功更新干员 {safe_data['name']} (ID: {operator_id})")
             else:
                 logger.warning(f"更新干员失败，没有找到ID为 {operator_id} 的干员")
@@ -406,7 +529,8 @@ class DatabaseManager:
     def delete_operator(self, operator_id: int) -> bool:
         """删除干员
         
-        此方法用于从数据库中删除指定干员ID的干员信息。
+        此方法用于从数据库中删除指定干员ID的干员信息，并在同一事务中
+        删除该干员的计算记录（ID会被之后新建的干员复用，旧记录不能保留）。
         
         Args:
             operator_id: 干员ID
@@ -417,10 +541,52 @@ class DatabaseManager:
         cursor = conn.cursor()
         
         try:
+            cursor.execute('DELETE FROM calculation_records WHERE operator_id = ?', (operator_id,))
             cursor.execute('DELETE FROM operators WHERE id = ?', (operator_id,))
             success = cursor.rowcount > 0  # 判断是否有行被删除
-            conn.commit()
+            
+            if success:
+                conn.commit()
+                self._data_version += 1
+            else:
+                conn.rollback()
             return success
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+    
+    def delete_operators(self, operator_ids: List[int]) -> int:
+        """批量删除干员
+        
+        此方法在一个事务中删除多个干员及其计算记录。ID按每批900个分块，
+        以免超过SQLite单条语句的参数数量上限。
+        
+        Args:
+            operator_ids: 干员ID列表
+        Returns:
+            int: 实际删除的干员数量
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            deleted = 0
+            for start in range(0, len(operator_ids), 900):
+                chunk = list(operator_ids[start:start + 900])
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(f'DELETE FROM calculation_records WHERE operator_id IN ({placeholders})', chunk)
+                cursor.execute(f'DELETE FROM operators WHERE id IN ({placeholders})', chunk)
+                deleted += cursor.rowcount
+            
+            conn.commit()
+            if deleted:
+                self._data_version += 1
+            return deleted
+        except Exception:
+            conn.rollback()
+            raise
         finally:
             conn.close()
     
@@ -437,26 +603,24 @@ class DatabaseManager:
         cursor = conn.cursor()
         
         try:
-            # 开始事务
+            # 开始事务：所有删除在同一事务内完成，只提交一次
             cursor.execute('BEGIN TRANSACTION')
             
-            # 获取删除前的干员数量
-            cursor.execute('SELECT COUNT(*) as count FROM operators')
-            operator_count = cursor.fetchone()['count']
-            
-            # 删除所有相关的计算记录
+            # 删除所有相关的计算记录（单条语句批量删除）
             cursor.execute('DELETE FROM calculation_records WHERE operator_id IS NOT NULL')
             deleted_calc_records = cursor.rowcount
             
-            # 删除所有干员
+            # 删除所有干员（无WHERE条件，SQLite可直接清空整表）
+            # 删除数量直接取自rowcount，无需额外的COUNT查询
             cursor.execute('DELETE FROM operators')
             deleted_operators = cursor.rowcount
             
             # 重置自增ID序列
-            cursor.execute('DELETE FROM sqlite_sequence WHERE name = "operators"')
+            cursor.execute('DELETE FROM sqlite_sequence WHERE name = ?', ('operators',))
             
             # 提交事务
             cursor.execute('COMMIT')
+            self._data_version += 1
             
             result = {
                 'success': True,
@@ -595,28 +759,21 @@ class DatabaseManager:
                 }
             
             # 创建ID映射表
-            id_mapping = {}
-            temp_updates = []
+            id_mapping = {operator['id']: i + 1 for i, operator in enumerate(operators)}
             
-            # 第一步：将所有ID临时设置为负值，避免唯一约束冲突
-            for i, operator in enumerate(operators):
-                old_id = operator['id']
-                temp_id = -(i + 1)  # 使用负数作为临时ID
-                
-                cursor.execute('UPDATE operators SET id = ? WHERE id = ?', (temp_id, old_id))
-                temp_updates.append((temp_id, old_id, i + 1))
+            # 第一步：用一条语句将所有ID临时设置为负值，避免唯一约束冲突
+            cursor.execute('UPDATE operators SET id = -id')
             
-            # 第二步：将临时ID更新为最终的连续ID
-            for temp_id, old_id, new_id in temp_updates:
-                cursor.execute('UPDATE operators SET id = ? WHERE id = ?', (new_id, temp_id))
-                id_mapping[old_id] = new_id
-                
-                # 同时更新计算记录表的外键引用
-                cursor.execute('''
-                    UPDATE calculation_records 
-                    SET operator_id = ? 
-                    WHERE operator_id = ?
-                ''', (new_id, old_id))
+            # 第二步：将临时ID批量更新为最终的连续ID
+            cursor.executemany('UPDATE operators SET id = ? WHERE id = ?',
+                               [(new_id, -old_id) for old_id, new_id in id_mapping.items()])
+            
+            # 同时更新计算记录表的外键引用（新ID不大于旧ID，按旧ID升序更新不会互相覆盖）
+            cursor.executemany('''
+                UPDATE calculation_records 
+                SET operator_id = ? 
+                WHERE operator_id = ?
+            ''', [(new_id, old_id) for old_id, new_id in id_mapping.items() if old_id != new_id])
             
             # 重置自增ID序列，确保下次插入从正确的ID开始
             cursor.execute('DELETE FROM sqlite_sequence WHERE name = "operators"')
@@ -624,6 +781,7 @@ class DatabaseManager:
             
             # 提交事务
             cursor.execute('COMMIT')
+            self._data_version += 1
             
             result = {
                 'success': True,
@@ -712,6 +870,7 @@ class DatabaseManager:
             
             record_id = cursor.lastrowid  # 获取新插入的记录ID
             conn.commit()
+            self._records_version += 1
             return record_id
             
         except Exception as e:
@@ -734,15 +893,7 @@ class DatabaseManager:
         cursor = conn.cursor()
         
         try:
-            today = datetime.now().strftime('%Y-%m-%d')  # 获取今天日期字符串
-            cursor.execute('''
-                SELECT COUNT(*) as count 
-                FROM calculation_records 
-                WHERE DATE(created_at) = ?
-            ''', (today,))
-            
-            result = cursor.fetchone()
-            return result['count'] if result else 0
+            return self._query_today_calculations(cursor)
             
         except Exception as e:
             print(f"获取今日计算次数失败: {e}")
@@ -750,6 +901,23 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    def _query_today_calculations(self, cursor) -> int:
+        """在给定游标上统计今日计算次数
+        
+        created_at以本地时间文本存储，按 [今天, 明天) 的范围比较，
+        可以使用created_at索引，避免对每行调用DATE()。
+        """
+        today = datetime.now().date()
+        tomorrow = today + timedelta(days=1)
+        cursor.execute('''
+            SELECT COUNT(*) as count 
+            FROM calculation_records 
+            WHERE created_at >= ? AND created_at < ?
+        ''', (today.strftime('%Y-%m-%d'), tomorrow.strftime('%Y-%m-%d')))
+        
+        result = cursor.fetchone()
+        return result['count'] if result else 0
+    
     def get_calculation_history(self, limit: int = 100) -> List[Dict[str, Any]]:
         """获取计算历史记录
         
@@ -766,30 +934,7 @@ class DatabaseManager:
         cursor = conn.cursor()
         
         try:
-            cursor.execute('''
-                SELECT cr.*, o.name as operator_name
-                FROM calculation_records cr
-                LEFT JOIN operators o ON cr.operator_id = o.id
-                ORDER BY cr.created_at DESC
-                LIMIT ?
-            ''', (limit,))
-            
-            rows = cursor.fetchall()
-            records = []
-            
-            for row in rows:
-                record = dict(row)
-                # 解析JSON字段
-                try:
-                    record['parameters'] = json.loads(record['parameters']) if record['parameters'] else {}
-                    record['results'] = json.loads(record['results']) if record['results'] else {}
-                except:
-                    record['parameters'] = {}
-                    record['results'] = {}
-                
-                records.append(record)
-            
-            return records
+            return self._query_calculation_history(cursor, limit)
             
         except Exception as e:
             print(f"获取计算历史失败: {e}")
@@ -797,6 +942,33 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    def _query_calculation_history(self, cursor, limit: int) -> List[Dict[str, Any]]:
+        """在给定游标上查询计算历史记录（按时间倒序）"""
+        cursor.execute('''
+            SELECT cr.*, o.name as operator_name
+            FROM calculation_records cr
+            LEFT JOIN operators o ON cr.operator_id = o.id
+            ORDER BY cr.created_at DESC
+            LIMIT ?
+        ''', (limit,))
+        
+        rows = cursor.fetchall()
+        records = []
+        
+        for row in rows:
+            record = dict(row)
+            # 解析JSON字段
+            try:
+                record['parameters'] = json.loads(record['parameters']) if record['parameters'] else {}
+                record['results'] = json.loads(record['results']) if record['results'] else {}
+            except:
+                record['parameters'] = {}
+                record['results'] = {}
+            
+            records.append(record)
+        
+        return records
+    
     def record_import(self, import_type: str, file_name: str, record_count: int = 0, 
                      status: str = 'success', error_message: str = None) -> int:
         """记录导入操作 - 使用本地时间
@@ -825,6 +997,7 @@ class DatabaseManager:
             
             record_id = cursor.lastrowid  # 获取新插入的导入记录ID
             conn.commit()
+            self._records_version += 1
             return record_id
             
         except Exception as e:
@@ -847,14 +1020,7 @@ class DatabaseManager:
         cursor = conn.cursor()
         
         try:
-            cursor.execute('''
-                SELECT * FROM import_records 
-                ORDER BY created_at DESC 
-                LIMIT ?
-            ''', (limit,))
-            
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
+            return self._query_import_records(cursor, limit)
             
         except Exception as e:
             print(f"获取导入记录失败: {e}")
@@ -876,39 +1042,7 @@ class DatabaseManager:
         cursor = conn.cursor()
         
         try:
-            # 获取基础统计
-            summary = {}
-            
-            # 干员总数
-            cursor.execute('SELECT COUNT(*) as count FROM operators')
-            result = cursor.fetchone()
-            summary['total_operators'] = result['count'] if result else 0
-            
-            # 今日计算次数
-            summary['today_calculations'] = self.get_today_calculations()
-            
-            # 导入记录总数
-            cursor.execute('SELECT COUNT(*) as count FROM import_records')
-            result = cursor.fetchone()
-            summary['total_imports'] = result['count'] if result else 0
-            
-            # 计算记录总数
-            cursor.execute('SELECT COUNT(*) as count FROM calculation_records')
-            result = cursor.fetchone()
-            summary['total_calculations'] = result['count'] if result else 0
-            
-            # 职业分布
-            cursor.execute('''
-                SELECT class_type, COUNT(*) as count 
-                FROM operators 
-                GROUP BY class_type
-            ''')
-            class_distribution = {}
-            for row in cursor.fetchall():
-                class_distribution[row['class_type']] = row['count']
-            summary['class_distribution'] = class_distribution
-            
-            return summary
+            return self._query_statistics_summary(cursor)
             
         except Exception as e:
             print(f"获取统计摘要失败: {e}")
@@ -922,6 +1056,81 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    def _query_import_records(self, cursor, limit: int) -> List[Dict[str, Any]]:
+        """在给定游标上查询导入记录（按时间倒序）"""
+        cursor.execute('''
+            SELECT * FROM import_records 
+            ORDER BY created_at DESC 
+            LIMIT ?
+        ''', (limit,))
+        
+        rows = cursor.fetchall()
+        return [dict(row) for row in rows]
+    
+    def _query_statistics_summary(self, cursor) -> Dict[str, Any]:
+        """在给定游标上查询统计摘要"""
+        summary = {}
+        
+        # 干员总数
+        cursor.execute('SELECT COUNT(*) as count FROM operators')
+        result = cursor.fetchone()
+        summary['total_operators'] = result['count'] if result else 0
+        
+        # 今日计算次数（复用同一连接）
+        summary['today_calculations'] = self._query_today_calculations(cursor)
+        
+        # 导入记录总数
+        cursor.execute('SELECT COUNT(*) as count FROM import_records')
+        result = cursor.fetchone()
+        summary['total_imports'] = result['count'] if result else 0
+        
+        # 计算记录总数
+        cursor.execute('SELECT COUNT(*) as count FROM calculation_records')
+        result = cursor.fetchone()
+        summary['total_calculations'] = result['count'] if result else 0
+        
+        # 职业分布
+        cursor.execute('''
+            SELECT class_type, COUNT(*) as count 
+            FROM operators 
+            GROUP BY class_type
+        ''')
+        class_distribution = {}
+        for row in cursor.fetchall():
+            class_distribution[row['class_type']] = row['count']
+        summary['class_distribution'] = class_distribution
+        
+        return summary
+    
+    def get_overview_bundle(self, activity_limit: int = 5) -> Dict[str, Any]:
+        """获取概览面板所需的全部数据
+        
+        此方法在同一个连接和读事务中依次查询统计摘要、最近的导入记录和
+        最近的计算记录，取代分别调用三个方法时的多次连接开销。
+        
+        Args:
+            activity_limit: 导入记录和计算记录各自返回的最大数量
+        Returns:
+            Dict[str, Any]: {'summary': 统计摘要, 'imports': 导入记录列表, 'calcs': 计算记录列表}
+        Raises:
+            Exception: 查询失败时抛出
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            # 显式读事务，保证三组查询看到一致的数据
+            cursor.execute('BEGIN')
+            bundle = {
+                'summary': self._query_statistics_summary(cursor),
+                'imports': self._query_import_records(cursor, activity_limit),
+                'calcs': self._query_calculation_history(cursor, activity_limit)
+            }
+            conn.commit()
+            return bundle
+        finally:
+            conn.close()
+    
     def cleanup_old_records(self, days: int = 30):
         """清理旧记录
         
@@ -957,6 +1166,7 @@ class DatabaseManager:
             deleted_imports = cursor.rowcount  # 被删除的导入记录数
             
             conn.commit()
+            self._records_version += 1
             
             return {
                 'deleted_calculations': deleted_calculations,
@@ -23,6 +23,9 @@ class SortableTreeview(ttk.Treeview):
         # 原始标题文本缓存
         self.original_headings = {}
         
+        # 外部提供的排序键函数，见set_sort_key_provider
+        self.sort_key_provider = None
+        
         # 排序指示器
         self.sort_indicators = {
             'asc': ' ▲',
@@ -52,6 +55,17 @@ class SortableTreeview(ttk.Treeview):
             # 绑定表头点击事件
             self.heading(column, command=lambda col=column: self.sort_by_column(col))
     
+    def set_sort_key_provider(self, provider: Optional[Callable[[str], Optional[Dict[str, Any]]]]):
+        """设置预计算排序键的提供函数
+        
+        provider(column) 返回 {项目ID: 排序键} 字典，排序时直接使用这些键，
+        不再逐行读取单元格并解析文本；返回None时回退到默认方式。
+        
+        Args:
+            provider: 排序键提供函数，None表示取消
+        """
+        self.sort_key_provider = provider
+    
     def sort_by_column(self, column: str, ascending: Optional[bool] = None):
         """按指定列排序
         
@@ -74,14 +88,21 @@ class SortableTreeview(ttk.Treeview):
         self.sort_ascending[column] = ascending
         self.current_sort_column = column
         
-        # 获取所有项目
-        items = [(self.set(item, column), item) for item in self.get_children('')]
-        
-        # 排序
-        items.sort(key=lambda x: self.get_sort_key(x[0]), reverse=not ascending)
+        sort_keys = self.sort_key_provider(column) if self.sort_key_provider else None
+        if sort_keys is not None:
+            # 使用预计算的排序键，未提供键的项目排在最后
+            items = list(self.get_children(''))
+            items.sort(key=lambda item: sort_keys.get(item, (1, 0)), reverse=not ascending)
+        else:
+            # 获取所有项目
+            values = [(self.set(item, column), item) for item in self.get_children('')]
+            
+            # 排序
+            values.sort(key=lambda x: self.get_sort_key(x[0]), reverse=not ascending)
+            items = [item for value, item in values]
         
         # 重新插入项目
-        for index, (value, item) in enumerate(items):
+        for index, item in enumerate(items):
             self.move(item, '', index)
         
         # 更新表头显示
@@ -109,7 +109,6 @@ class ThemeSelector(ttk.Frame):
             themes = self.theme_manager.get_available_themes()
             if current_theme in themes:
                 index = themes.index(current_theme)
-                theme_names = [self.theme_manager.get_theme_display_name(theme) for theme in themes]
                 self.theme_combobox.current(index)
                 
                 # 更新预览标签
@@ -0,0 +1,97 @@
+# confirm_delete_all_dialog.py - 清空所有干员的确认对话框
+
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+import tkinter as tk
+
+class ConfirmDeleteAllDialog(ttk.Toplevel):
+    """清空所有干员的确认对话框
+
+    将风险提示和确认文本输入合并在同一个模态窗口中，
+    只有输入正确的确认文本后才能点击确认按钮。
+    """
+
+    CONFIRM_TEXT = 'DELETE ALL'
+
+    def __init__(self, parent, operator_count: int):
+        """
+        初始化确认对话框
+
+        Args:
+            parent: 父窗口
+            operator_count: 将要删除的干员数量
+        """
+        super().__init__(parent)
+
+        self.parent_window = parent
+        self.operator_count = operator_count
+        self.confirmed = False
+        self.confirm_var = tk.StringVar()
+
+        # 设置对话框属性
+        self.title("危险操作确认")
+        self.resizable(False, False)
+        self.transient(parent)
+        self.protocol("WM_DELETE_WINDOW", self.cancel)
+
+        # 创建界面
+        self.setup_ui()
+
+        # 设置模态
+        self.grab_set()
+        self.confirm_entry.focus_set()
+
+    def setup_ui(self):
+        """创建对话框界面"""
+        main_frame = ttk.Frame(self, padding=20)
+        main_frame.pack(fill=BOTH, expand=True)
+
+        ttk.Label(
+            main_frame,
+            text=f"⚠️ 您即将删除所有 {self.operator_count} 个干员数据！\n\n"
+                 "此操作将：\n"
+                 "• 删除所有干员信息\n"
+                 "• 删除相关的计算记录\n"
+                 "• 重置ID序列\n\n"
+                 "⚠️ 此操作不可恢复！",
+            justify=LEFT
+        ).pack(anchor='w')
+
+        ttk.Label(main_frame, text=f"请输入 '{self.CONFIRM_TEXT}' 来确认删除所有干员：").pack(
+            anchor='w', pady=(15, 5))
+
+        self.confirm_entry = ttk.Entry(main_frame, textvariable=self.confirm_var, width=30)
+        self.confirm_entry.pack(fill=X)
+        self.confirm_entry.bind('<Return>', lambda e: self.confirm())
+
+        # 按钮栏
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill=X, pady=(15, 0))
+
+        ttk.Button(button_frame, text="取消", bootstyle=SECONDARY,
+                   command=self.cancel).pack(side=RIGHT, padx=(5, 0))
+        self.confirm_button = ttk.Button(button_frame, text="确认", bootstyle=DANGER,
+                                         command=self.confirm, state='disabled')
+        self.confirm_button.pack(side=RIGHT)
+
+        # 输入正确的确认文本后才启用确认按钮
+        self.confirm_var.trace_add("write", self.on_confirm_text_changed)
+
+    def on_confirm_text_changed(self, *args):
+        """确认文本变化"""
+        if self.confirm_var.get() == self.CONFIRM_TEXT:
+            self.confirm_button.configure(state='normal')
+        else:
+            self.confirm_button.configure(state='disabled')
+
+    def confirm(self):
+        """确认删除"""
+        if self.confirm_var.get() != self.CONFIRM_TEXT:
+            return
+        self.confirmed = True
+        self.destroy()
+
+    def cancel(self):
+        """取消操作"""
+        self.confirmed = False
+        self.destroy()
@@ -154,7 +154,7 @@ class DamageAnalyzerMainWindow(ttk.Window):
         
         # 初始化导入导出管理器和报告生成器
         self.import_export_manager = ImportExportManager(db_manager)
-        self.report_generator = ReportGenerator(db_manager)
+        self.report_generator = ReportGenerator(db_manager, root=self)
         
         # 设置状态回调
         self.import_export_manager.set_status_callback(self.update_apple_status)
@@ -968,14 +968,17 @@ F1 - 关于
                 except Exception as e:
                     logger.error(f"刷新面板 {panel_name} 失败: {e}")
             
-            # 特别处理概览面板
+            # 特别处理概览面板：不可见时推迟到切换回概览页时再刷新
             if hasattr(self, 'overview_panel'):
                 try:
-                    self.overview_panel.refresh_data()
-                    logger.info("已刷新概览面板")
+                    self.overview_panel.mark_dirty()
+                    logger.info("已通知概览面板刷新")
                 except Exception as e:
                     logger.error(f"刷新概览面板失败: {e}")
             
+            # 数据已变更，丢弃报告数据缓存
+            self.report_generator.invalidate_cache()
+            
             # 刷新侧边栏数据
             if hasattr(self, 'sidebar_panel'):
                 try:
@@ -3,17 +3,122 @@
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 import tkinter as tk
-from tkinter import messagebox, StringVar, BooleanVar
+from tkinter import messagebox, filedialog, StringVar, BooleanVar
 import sys
 import os
+import logging
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Dict, Optional, Callable, Any
 
 # 添加项目路径
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from core.damage_calculator import calculator
+from core.damage_calculator import calculator, PHYSICAL_ATTACK_TYPES, MAGICAL_ATTACK_TYPES
 from ui.invisible_scroll_frame import InvisibleScrollFrame
 from ui.components.sortable_treeview import SortableTreeview
+from ui.confirm_delete_all_dialog import ConfirmDeleteAllDialog
+from data.csv_handler import CsvHandler
+
+logger = logging.getLogger(__name__)
+
+# 干员表格的列定义
+OPERATOR_COLUMNS = ('id', 'name', 'class_type', 'hp', 'atk', 'def', 'cost')
+
+# 攻击类型映射表（基于职业判断）
+CLASS_ATTACK_TYPE = {
+    '先锋': '物伤', '近卫': '物伤', '重装': '物伤', '狙击': '物伤',
+    '术师': '法伤', '辅助': '法伤', '医疗': '法伤', '特种': '物伤'
+}
+
+# 表单字段分组定义
+FIELD_GROUPS = {
+    '基础信息': {
+        'name': '干员名称',
+        'class_type': '职业类型'
+    },
+    '战斗属性': {
+        'hp': '生命值',
+        'atk': '攻击力',
+        'atk_type': '攻击类型',
+        'def': '防御力',
+        'mdef': '法抗',
+        'atk_speed': '攻击速度',
+        'heal_amount': '治疗量',
+        'hit_count': '打数',
+        'block_count': '阻挡数'
+    },
+    '部署配置': {
+        'cost': '部署费用'
+    }
+}
+
+# 数值字段（分别使用IntVar/DoubleVar），其余字段为字符串
+INT_FIELDS = frozenset({'hp', 'atk', 'def', 'mdef', 'block_count', 'cost', 'heal_amount'})
+FLOAT_FIELDS = frozenset({'atk_speed', 'hit_count'})
+NUMERIC_FIELDS = INT_FIELDS | FLOAT_FIELDS
+
+# 表单字段默认值，未列出的字段数值为0、字符串为空
+FIELD_DEFAULTS = {
+    'hit_count': 1.0,
+    'class_type': '狙击',
+    'atk_type': '物伤',
+    'block_count': 1,
+    'cost': 10
+}
+FORM_DEFAULTS = {
+    key: FIELD_DEFAULTS.get(key, 0 if key in NUMERIC_FIELDS else '')
+    for fields in FIELD_GROUPS.values() for key in fields
+}
+
+# 实时预览显示的性能指标：(结果键, 显示名称, 格式)
+PREVIEW_METRICS = (
+    ('dps', 'DPS', '{:.1f}'),
+    ('dph', 'DPH', '{:.1f}'),
+    ('hps', 'HPS', '{:.1f}'),
+    ('hph', 'HPH', '{:.1f}'),
+    ('armor_break_point', '破甲线', '{}'),
+    ('survivability', '生存能力', '{:.1f}'),
+    ('cost_efficiency', '性价比', '{:.2f}')
+)
+
+# 表单字段 -> 受其影响的预览指标，字段变化时只重新计算这些指标
+METRIC_DEPENDENCIES = {
+    'atk': frozenset({'dph', 'dps', 'armor_break_point', 'cost_efficiency'}),
+    'atk_type': frozenset({'dph', 'dps', 'cost_efficiency'}),
+    'atk_speed': frozenset({'dps', 'cost_efficiency', 'hps'}),
+    'hit_count': frozenset({'dph', 'dps', 'cost_efficiency', 'hph'}),
+    'cost': frozenset({'cost_efficiency'}),
+    'class_type': frozenset({'hps', 'hph'}),
+    'heal_amount': frozenset({'hps', 'hph'}),
+    'hp': frozenset({'survivability'}),
+    'def': frozenset({'survivability'})
+}
+
+# 表单字段校验的防抖延迟（毫秒）
+FORM_DEBOUNCE_MS = 150
+
+# 伤害类型筛选项对应的攻击类型取值（"全部"不做限制）
+DAMAGE_TYPE_FILTERS = {
+    '物伤': PHYSICAL_ATTACK_TYPES,
+    '法伤': MAGICAL_ATTACK_TYPES
+}
+
+@lru_cache(maxsize=128)
+def _cached_performance(operator_items):
+    """按表单数据缓存的性能指标计算结果
+    
+    计算只依赖传入的数据，因此相同数据的结果可以直接复用。
+    """
+    return calculator.calculate_operator_performance(dict(operator_items))
+
+def _performance_cache_key(operator_data):
+    """将表单数据转换为可哈希的缓存键"""
+    return tuple(sorted(
+        (key, value) for key, value in operator_data.items()
+        if isinstance(value, (int, float, str, bool))
+    ))
 
 class OperatorEditor:
     """干员属性编辑界面"""
@@ -25,6 +130,7 @@ class OperatorEditor:
         
         # 数据变量
         self.operator_vars = {}
+        self._var_getters = {}  # 字段名 -> 读取函数，在initialize_variables中创建
         self.operator_inputs = {}
         self.current_operator_id = None
         self.is_editing = False
@@ -37,27 +143,28 @@ class OperatorEditor:
         self.filtered_operators = []
         self.class_vars = {}  # 存储每个职业的BooleanVar
         
-        # 字段分组定义
-        self.field_groups = {
-            '基础信息': {
-                'name': '干员名称',
-                'class_type': '职业类型'
-            },
-            '战斗属性': {
-                'hp': '生命值',
-                'atk': '攻击力',
-                'atk_type': '攻击类型',
-                'def': '防御力',
-                'mdef': '法抗',
-                'atk_speed': '攻击速度',
-                'heal_amount': '治疗量',
-                'hit_count': '打数',
-                'block_count': '阻挡数'
-            },
-            '部署配置': {
-                'cost': '部署费用'
-            }
-        }
+        # 搜索筛选在单独的工作线程中执行，避免阻塞界面
+        self._filter_executor = ThreadPoolExecutor(max_workers=1)
+        self._filter_generation = 0
+        
+        # 实时预览的性能计算同样放在工作线程中执行
+        self._preview_executor = ThreadPoolExecutor(max_workers=1)
+        
+        # 可重复使用的预览窗口及指标显示控件
+        self._preview_window = None
+        self._preview_tree = None
+        self._pending_preview_metrics = set()  # 等待局部刷新的预览指标
+        self._preview_metrics_after_id = None
+        
+        # 上一次应用到界面的筛选条件，以及干员数据的版本号
+        self._last_filter_inputs = None
+        self._data_version = 0
+        self._db_version_seen = None  # 上次从数据库加载时的数据版本号
+        self._class_refilter_pending = False
+        
+        # 表单校验的防抖定时器
+        self._hit_count_after_id = None
+        self._class_type_after_id = None
         
         # 初始化变量（必须在创建界面之前）
         self.initialize_variables()
@@ -70,12 +177,6 @@ class OperatorEditor:
     
     def determine_attack_type(self, operator):
         """判断干员攻击类型"""
-        # 攻击类型映射表（基于职业判断）
-        CLASS_ATTACK_TYPE = {
-            '先锋': '物伤', '近卫': '物伤', '重装': '物伤', '狙击': '物伤',
-            '术师': '法伤', '辅助': '法伤', '医疗': '法伤', '特种': '物伤'
-        }
-        
         # 优先检查数据库中的攻击类型字段
         if 'atk_type' in operator and operator['atk_type']:
             return operator['atk_type']
@@ -86,16 +187,42 @@ class OperatorEditor:
     
     def filter_operators(self):
         """根据当前筛选条件过滤干员列表"""
-        if not self.all_operators:
+        # 使尚未完成的后台筛选结果失效
+        self._filter_generation += 1
+        
+        filter_inputs = self._get_filter_inputs()
+        # 筛选条件和数据都未变化时，当前显示已是最新结果
+        if filter_inputs == self._last_filter_inputs:
             return
         
+        result = self._compute_filtered_operators(self.all_operators, filter_inputs)
+        self._apply_filter_result(result, filter_inputs)
+    
+    def _get_filter_inputs(self):
+        """读取当前筛选条件（只能在主线程调用）"""
         search_text = self.search_var.get().lower().strip()
-        selected_classes = {cls for cls, var in self.class_vars.items() if var.get()}
+        # 职业集合只在复选框变化时更新，这里直接复用缓存
+        selected_classes = frozenset(self.selected_classes)
         damage_type = self.damage_type_filter_var.get()
+        return search_text, selected_classes, damage_type, self._data_version
+    
+    def _compute_filtered_operators(self, operators, filter_inputs):
+        """执行筛选并构建表格行数据
         
-        self.filtered_operators = []
+        纯Python逻辑，不访问任何Tk控件或变量，可以在后台线程中执行。
+        
+        Returns:
+            tuple: (筛选后的干员列表, 表格行数据列表)
+        """
+        search_text, selected_classes, damage_type, _ = filter_inputs
+        filtered_operators = []
+        rows = []
+        
+        # 伤害类型筛选所允许的攻击类型，在循环外确定一次
+        allowed_types = DAMAGE_TYPE_FILTERS.get(damage_type)
         
-        for operator in self.all_operators:
+        # 单次遍历：筛选的同时构建表格行数据
+        for operator in operators:
             # 名称搜索筛选
             if search_text and search_text not in operator['name'].lower():
                 continue
@@ -104,54 +231,197 @@ class OperatorEditor:
             if not selected_classes or operator['class_type'] not in selected_classes:
                 continue
                 
-            # 伤害类型筛选
-            if damage_type != "全部":
-                operator_damage_type = self.determine_attack_type(operator)
-                if (damage_type == "物伤" and operator_damage_type not in ['物伤', '物理伤害']) or \
-                   (damage_type == "法伤" and operator_damage_type not in ['法伤', '法术伤害']):
-                    continue
+            # 伤害类型筛选（攻击类型已在加载数据时解析）
+            if allowed_types is not None and operator['_atk_type_resolved'] not in allowed_types:
+                continue
                     
-            self.filtered_operators.append(operator)
+            filtered_operators.append(operator)
+            rows.append(operator['_row_values'])
         
-        self.update_operator_display()
-        self.update_filter_statistics()
+        return filtered_operators, rows
     
-    def update_operator_display(self):
-        """更新干员列表显示"""
+    def _apply_filter_result(self, result, filter_inputs):
+        """将筛选结果应用到界面（只能在主线程调用）"""
+        self.filtered_operators, rows = result
+        self._apply_rows(rows)
+        self._last_filter_inputs = filter_inputs
+    
+    def _build_row_values(self, operator):
+        """构建干员在表格中的一行数据"""
+        return (
+            operator.get('id', ''),
+            operator.get('name', ''),
+            operator.get('class_type', ''),
+            operator.get('hp', ''),
+            operator.get('atk', ''),
+            operator.get('def', ''),
+            operator.get('cost', '')
+        )
+    
+    def _prepare_operator(self, operator):
+        """为干员预先计算显示和筛选所需的派生字段（每次加载数据时执行一次）"""
+        operator['_row_values'] = self._build_row_values(operator)
+        operator['_sort_keys'] = tuple(
+            self.operator_treeview.get_sort_key(value) for value in operator['_row_values']
+        )
+        operator['_atk_type_resolved'] = self.determine_attack_type(operator)
+        return operator
+    
+    def _get_column_sort_keys(self, column):
+        """返回当前显示的干员在指定列上的排序键 {行ID: 排序键}"""
+        if column not in OPERATOR_COLUMNS:
+            return None
+        index = OPERATOR_COLUMNS.index(column)
+        return {str(operator['id']): operator['_sort_keys'][index]
+                for operator in self.filtered_operators}
+    
+    def _apply_rows(self, rows):
+        """将行数据一次性写入表格并更新统计信息"""
         # 清空现有数据
-        for item in self.operator_treeview.get_children():
-            self.operator_treeview.delete(item)
+        children = self.operator_treeview.get_children()
+        if children:
+            self.operator_treeview.delete(*children)
         
         # 添加筛选后的数据
-        if self.filtered_operators:
-            for operator in self.filtered_operators:
-                values = (
-                    operator.get('id', ''),
-                    operator.get('name', ''),
-                    operator.get('class_type', ''),
-                    operator.get('hp', ''),
-                    operator.get('atk', ''),
-                    operator.get('def', ''),
-                    operator.get('cost', '')
-                )
-                self.operator_treeview.insert('', 'end', values=values)
+        if rows:
+            # 以干员ID作为行标识，便于之后直接定位并增量更新单行
+            for values in rows:
+                self.operator_treeview.insert('', 'end', iid=str(values[0]), values=values)
         else:
             # 无结果时显示友好提示
             self.operator_treeview.insert('', 'end', values=(
                 '', '未找到符合条件的干员', '', '', '', '', ''
             ))
+        
+        self.update_filter_statistics(len(rows))
+    
+    def update_operator_display(self):
+        """更新干员列表显示"""
+        self._apply_rows([operator['_row_values'] for operator in self.filtered_operators])
+        self._last_filter_inputs = None
+    
+    def _apply_operator_change(self, operator_id, operator=None):
+        """将单个干员的增删改同步到内存列表和表格，避免整表刷新
+        
+        Args:
+            operator_id: 发生变化的干员ID
+            operator: 最新的干员数据，为None表示该干员已被删除
+        """
+        if operator is not None:
+            self._prepare_operator(operator)
+        
+        # 构建新列表后整体替换，后台筛选线程可能仍在遍历旧列表
+        operators = []
+        replaced = False
+        for existing in self.all_operators:
+            if existing['id'] == operator_id:
+                replaced = True
+                if operator is not None:
+                    operators.append(operator)
+            else:
+                operators.append(existing)
+        if operator is not None and not replaced:
+            operators.append(operator)
+        
+        self.all_operators = operators
+        self._data_version += 1
+        
+        # 只有这一次写入发生在上次加载之后时，内存列表才与数据库一致
+        if self._db_version_seen is not None and \
+           self.db_manager.get_data_version() == self._db_version_seen + 1:
+            self._db_version_seen += 1
+        
+        filter_inputs = self._get_filter_inputs()
+        last_inputs = self._last_filter_inputs
+        # 表格内容与当前筛选条件不一致时（如搜索尚在防抖中），退回到完整筛选
+        if last_inputs is None or filter_inputs[:3] != last_inputs[:3]:
+            self.filter_operators()
+            return
+        
+        self.filtered_operators, _ = self._compute_filtered_operators(operators, filter_inputs)
+        self._last_filter_inputs = filter_inputs
+        
+        if not self.filtered_operators:
+            # 显示无结果提示
+            self._apply_rows([])
+            return
+        
+        iid = str(operator_id)
+        visible = operator is not None and operator in self.filtered_operators
+        if visible and self.operator_treeview.exists(iid):
+            self.operator_treeview.item(iid, values=operator['_row_values'])
+        elif visible:
+            # 移除可能存在的无结果提示行
+            if len(self.filtered_operators) == 1:
+                children = self.operator_treeview.get_children()
+                if children:
+                    self.operator_treeview.delete(*children)
+            self.operator_treeview.insert('', 'end', iid=iid, values=operator['_row_values'])
+        elif self.operator_treeview.exists(iid):
+            self.operator_treeview.delete(iid)
+        
+        self.update_filter_statistics(len(self.filtered_operators))
     
-    def on_search_changed(self, event=None):
+    def on_search_changed(self, *args):
         """搜索条件变化"""
         # 添加防抖动处理
         if hasattr(self, '_search_after_id'):
             self.parent.after_cancel(self._search_after_id)
-        self._search_after_id = self.parent.after(300, self.filter_operators)
+        self._search_after_id = self.parent.after(300, self._run_search_filter)
+    
+    def _run_search_filter(self):
+        """防抖结束后，在后台线程中执行搜索筛选"""
+        if not self.all_operators:
+            return
+        
+        self._filter_generation += 1
+        generation = self._filter_generation
+        
+        filter_inputs = self._get_filter_inputs()
+        if filter_inputs == self._last_filter_inputs:
+            return
+        
+        future = self._filter_executor.submit(
+            self._compute_filtered_operators, self.all_operators, filter_inputs
+        )
+        # 回调在工作线程中触发，通过after切回主线程更新界面
+        future.add_done_callback(
+            lambda f: self.parent.after(0, self._on_search_filter_done, f, generation, filter_inputs)
+        )
+    
+    def _on_search_filter_done(self, future, generation, filter_inputs):
+        """后台搜索筛选完成"""
+        # 期间已经发起了新的筛选，丢弃过期结果
+        if generation != self._filter_generation:
+            return
+        
+        try:
+            result = future.result()
+        except Exception as e:
+            self.update_status(f"筛选干员失败：{str(e)}")
+            return
+        
+        self._apply_filter_result(result, filter_inputs)
+    
+    def _schedule_class_refilter(self, *args):
+        """职业复选框变量写入时调用，将一批连续的变化合并为一次筛选"""
+        if self._class_refilter_pending:
+            return
+        self._class_refilter_pending = True
+        self.parent.after_idle(self._run_class_refilter)
+    
+    def _run_class_refilter(self):
+        """执行合并后的职业筛选"""
+        self._class_refilter_pending = False
+        self.on_class_selection_changed()
     
     def on_class_selection_changed(self):
         """处理职业复选框变化事件"""
+        # 更新选中的职业集合（只在此处读取一次复选框变量）
+        self.selected_classes = {cls for cls, var in self.class_vars.items() if var.get()}
+        
         # 更新全选状态
-        selected_count = sum(1 for var in self.class_vars.values() if var.get())
+        selected_count = len(self.selected_classes)
         total_count = len(self.class_vars)
         
         if selected_count == total_count:
@@ -176,7 +446,7 @@ class OperatorEditor:
         else:
             self.selected_classes.clear()
         
-        self.filter_operators()
+        # 上面的var.set会触发变量跟踪，筛选由_run_class_refilter合并执行一次
     
     def on_damage_type_filter_changed(self, event=None):
         """处理伤害类型筛选变化"""
@@ -199,10 +469,11 @@ class OperatorEditor:
         # 重新筛选
         self.filter_operators()
     
-    def update_filter_statistics(self):
+    def update_filter_statistics(self, filtered=None):
         """更新筛选统计信息显示"""
         total = len(self.all_operators)
-        filtered = len(self.filtered_operators)
+        if filtered is None:
+            filtered = len(self.filtered_operators)
         
         if total == filtered:
             stats_text = f"显示全部 {total} 个干员"
@@ -268,8 +539,8 @@ class OperatorEditor:
         list_container.pack(fill=BOTH, expand=True)
         
         # 定义表格列
-        columns = ('id', 'name', 'class_type', 'hp', 'atk', 'def', 'cost')
-        self.operator_treeview = SortableTreeview(list_container, columns=columns, show='tree headings', height=15)
+        self.operator_treeview = SortableTreeview(list_container, columns=OPERATOR_COLUMNS,
+                                                  show='tree headings', height=15)
         
         # 设置列标题和宽度
         self.operator_treeview.heading('#0', text='', anchor='w')
@@ -296,8 +567,9 @@ class OperatorEditor:
         self.operator_treeview.heading('cost', text='费用', anchor='center')
         self.operator_treeview.column('cost', width=60, anchor='center')
         
-        # 启用所有列的排序功能
+        # 启用所有列的排序功能，排序键使用加载数据时预计算的值
         self.operator_treeview.enable_sorting()
+        self.operator_treeview.set_sort_key_provider(self._get_column_sort_keys)
         
         # 添加滚动条
         tree_scrollbar = ttk.Scrollbar(list_container, orient=VERTICAL, command=self.operator_treeview.yview)
@@ -315,28 +587,46 @@ class OperatorEditor:
         self.create_context_menu()
     
     def create_context_menu(self):
-        """创建右键菜单"""
+        """创建右键菜单（只创建一次，右键时直接弹出）"""
+        self._context_target_iid = None
+        
         self.context_menu = tk.Menu(self.operator_treeview, tearoff=0)
-        self.context_menu.add_command(label="📝 编辑", command=self.edit_selected_operator)
-        self.context_menu.add_command(label="📋 复制", command=self.copy_selected_operator)
+        self.context_menu.add_command(label="📝 编辑",
+                                      command=lambda: self._run_context_command(self.edit_selected_operator))
+        self.context_menu.add_command(label="📋 复制",
+                                      command=lambda: self._run_context_command(self.copy_selected_operator))
         self.context_menu.add_separator()
-        self.context_menu.add_command(label="🗑️ 删除", command=self.delete_selected_operator)
+        self.context_menu.add_command(label="🗑️ 删除",
+                                      command=lambda: self._run_context_command(self.delete_selected_operator))
         
         # 绑定右键菜单
-        def show_context_menu(event):
-            try:
-                # 选中右键点击的项目
-                item = self.operator_treeview.identify_row(event.y)
-                if item:
-                    self.operator_treeview.selection_set(item)
-                    self.operator_treeview.focus(item)
-                    
-                    # 显示菜单
-                    self.context_menu.post(event.x_root, event.y_root)
-            except:
-                pass
+        self.operator_treeview.bind('<Button-3>', self._show_context_menu)
+    
+    def _show_context_menu(self, event):
+        """弹出右键菜单
         
-        self.operator_treeview.bind('<Button-3>', show_context_menu)
+        只记录右键点击的行，不立即选中，避免仅浏览菜单时触发选择事件并从数据库加载表单。
+        """
+        try:
+            item = self.operator_treeview.identify_row(event.y)
+            if item:
+                self._context_target_iid = item
+                
+                # 显示菜单
+                self.context_menu.post(event.x_root, event.y_root)
+        except tk.TclError:
+            pass
+    
+    def _run_context_command(self, command):
+        """执行右键菜单命令，此时才选中右键点击的干员"""
+        item = self._context_target_iid
+        self._context_target_iid = None
+        
+        if item and self.operator_treeview.exists(item):
+            self.operator_treeview.selection_set(item)
+            self.operator_treeview.focus(item)
+        
+        command()
     
     def create_search_filter_area(self, parent):
         """创建搜索和筛选区域"""
@@ -351,7 +641,8 @@ class OperatorEditor:
         ttk.Label(search_row, text="搜索干员：").pack(side=LEFT)
         search_entry = ttk.Entry(search_row, textvariable=self.search_var, width=20)
         search_entry.pack(side=LEFT, padx=(5, 10))
-        search_entry.bind('<KeyRelease>', self.on_search_changed)
+        # 只在文本真正变化时触发（方向键等按键不会触发筛选）
+        self.search_var.trace_add("write", self.on_search_changed)
         
         # 添加搜索提示
         ttk.Label(search_row, text="(输入干员名称)", 
@@ -400,8 +691,8 @@ class OperatorEditor:
         
         # 各职业复选框（变量已在initialize_variables中初始化）
         for class_name in classes:
-            cb = ttk.Checkbutton(parent, text=class_name, variable=self.class_vars[class_name],
-                               command=self.on_class_selection_changed)
+            # 筛选通过变量跟踪触发（见initialize_variables）
+            cb = ttk.Checkbutton(parent, text=class_name, variable=self.class_vars[class_name])
             cb.pack(side=LEFT, padx=2)
     
     def setup_edit_form(self, parent):
@@ -455,7 +746,7 @@ class OperatorEditor:
         """创建表单字段"""
         current_row = 0
         
-        for group_name, fields in self.field_groups.items():
+        for group_name, fields in FIELD_GROUPS.items():
             # 创建分组框
             group_frame = ttk.LabelFrame(self.scrollable_frame, text=group_name, padding=10)
             group_frame.grid(row=current_row, column=0, columnspan=2, sticky='ew', pady=10, padx=5)
@@ -499,41 +790,63 @@ class OperatorEditor:
         
         # 配置列权重
         self.scrollable_frame.columnconfigure(0, weight=1)
-        for i in range(len(self.field_groups)):
+        for i in range(len(FIELD_GROUPS)):
             self.scrollable_frame.grid_rowconfigure(i, weight=0)
     
     def initialize_variables(self):
         """初始化变量"""
         # 为每个字段创建StringVar或IntVar
-        for group_fields in self.field_groups.values():
+        for group_fields in FIELD_GROUPS.values():
             for key in group_fields.keys():
-                if key in ['hp', 'atk', 'def', 'mdef', 'block_count', 'cost', 'heal_amount']:
-                    self.operator_vars[key] = tk.IntVar()
-                elif key in ['atk_speed', 'hit_count']:
-                    self.operator_vars[key] = tk.DoubleVar()
+                if key in INT_FIELDS:
+                    var = tk.IntVar(value=FORM_DEFAULTS[key])
+                    self._var_getters[key] = var.get
+                elif key in FLOAT_FIELDS:
+                    var = tk.DoubleVar(value=FORM_DEFAULTS[key])
+                    self._var_getters[key] = var.get
                 else:
-                    self.operator_vars[key] = tk.StringVar()
-        
-        # 设置默认值
-        self.operator_vars['hit_count'].set(1.0)
-        self.operator_vars['class_type'].set('狙击')
-        self.operator_vars['atk_type'].set('物伤')
-        self.operator_vars['block_count'].set(1)
-        self.operator_vars['cost'].set(10)
+                    var = tk.StringVar(value=FORM_DEFAULTS[key])
+                    # 字符串字段读取时去除首尾空白
+                    self._var_getters[key] = lambda v=var: v.get().strip()
+                self.operator_vars[key] = var
+                
+                # 预览窗口打开时，字段变化只刷新受影响的指标
+                if key in METRIC_DEPENDENCIES:
+                    var.trace_add("write", lambda *args, k=key: self._invalidate_preview_metrics(METRIC_DEPENDENCIES[k]))
         
         # 初始化搜索筛选变量
         classes = ['先锋', '近卫', '重装', '狙击', '术师', '辅助', '医疗', '特种']
         for class_name in classes:
             self.class_vars[class_name] = BooleanVar(value=True)
+            self.class_vars[class_name].trace_add("write", self._schedule_class_refilter)
         
         # 初始化其他筛选变量
         self.select_all_var = BooleanVar(value=True)
     
-    def refresh_operator_list(self):
-        """刷新干员列表"""
+    def _get_form_data(self):
+        """读取表单中所有字段的当前值"""
+        return {key: getter() for key, getter in self._var_getters.items()}
+    
+    def refresh_operator_list(self, operators=None):
+        """刷新干员列表
+        
+        Args:
+            operators: 调用方已知的最新干员列表（如清空后为空列表），
+                提供时直接使用而不再查询数据库
+        """
         try:
-            # 先加载所有数据到all_operators
-            self.all_operators = self.db_manager.get_all_operators()
+            db_version = self.db_manager.get_data_version()
+            if operators is None and db_version != self._db_version_seen:
+                # 先用一次查询加载所有数据
+                operators = self.db_manager.get_all_operators()
+            
+            # 数据库自上次加载后没有变化时，直接复用已加载的干员列表
+            if operators is not None:
+                for operator in operators:
+                    self._prepare_operator(operator)
+                self.all_operators = operators
+                self._data_version += 1
+                self._db_version_seen = db_version
             
             # 如果筛选变量已初始化，则应用筛选
             if hasattr(self, 'class_vars') and self.class_vars:
@@ -579,21 +892,13 @@ class OperatorEditor:
         # 加载数据到变量
         for key, var in self.operator_vars.items():
             value = operator.get(key)
-            if value is not None:
-                if isinstance(var, (tk.IntVar, tk.DoubleVar)):
-                    var.set(value)
-                else:
-                    var.set(str(value))
-            else:
+            if value is None:
                 # 设置默认值
-                if key == 'hit_count':
-                    var.set(1.0)
-                elif key == 'heal_amount':
-                    var.set(0)
-                elif isinstance(var, (tk.IntVar, tk.DoubleVar)):
-                    var.set(0)
-                else:
-                    var.set('')
+                var.set(FORM_DEFAULTS[key])
+            elif key in NUMERIC_FIELDS:
+                var.set(value)
+            else:
+                var.set(str(value))
         
         # 更新字段状态
         self.update_heal_amount_state()
@@ -655,18 +960,18 @@ class OperatorEditor:
                     new_id = self.db_manager.insert_operator(copied_data)
                     if new_id:
                         messagebox.showinfo("成功", f"已复制干员：{original_name} -> {copied_data['name']}")
-                        self.refresh_operator_list()
                         
-                        # 选中新创建的干员
-                        for item in self.operator_treeview.get_children():
-                            values = self.operator_treeview.item(item, 'values')
-                            if values and int(values[0]) == new_id:
-                                self.operator_treeview.selection_set(item)
-                                self.operator_treeview.focus(item)
-                                operator = self.db_manager.get_operator(new_id)
-                                if operator:
-                                    self.load_operator_data(operator)
-                                break
+                        # 只向列表中添加新干员，无需整表刷新
+                        operator = self.db_manager.get_operator(new_id)
+                        if operator:
+                            self._apply_operator_change(new_id, operator)
+                            
+                            # 选中新创建的干员
+                            new_iid = str(new_id)
+                            if self.operator_treeview.exists(new_iid):
+                                self.operator_treeview.selection_set(new_iid)
+                                self.operator_treeview.focus(new_iid)
+                            self.load_operator_data(operator)
                         
                         self.update_status(f"已复制干员：{copied_data['name']}")
                     else:
@@ -689,13 +994,7 @@ class OperatorEditor:
                 return
             
             # 准备数据
-            operator_data = {}
-            for key, var in self.operator_vars.items():
-                value = var.get()
-                if isinstance(var, tk.StringVar):
-                    operator_data[key] = value.strip()
-                else:
-                    operator_data[key] = value
+            operator_data = self._get_form_data()
             
             # 特殊处理治疗量字段
             if operator_data['class_type'] != '医疗':
@@ -722,8 +1021,10 @@ class OperatorEditor:
                     messagebox.showerror("错误", "创建干员失败")
                     return
             
-            # 刷新列表
-            self.refresh_operator_list()
+            # 只更新发生变化的一行，无需整表刷新
+            operator = self.db_manager.get_operator(self.current_operator_id)
+            if operator:
+                self._apply_operator_change(self.current_operator_id, operator)
             self.is_editing = False
             self.update_edit_status("查看模式", "blue")
             
@@ -747,20 +1048,7 @@ class OperatorEditor:
     def reset_form(self):
         """重置表单"""
         for key, var in self.operator_vars.items():
-            if key == 'hit_count':
-                var.set(1.0)
-            elif key == 'class_type':
-                var.set('狙击')
-            elif key == 'atk_type':
-                var.set('物伤')
-            elif key == 'block_count':
-                var.set(1)
-            elif key == 'cost':
-                var.set(10)
-            elif isinstance(var, (tk.IntVar, tk.DoubleVar)):
-                var.set(0)
-            else:
-                var.set('')
+            var.set(FORM_DEFAULTS[key])
         
         self.update_heal_amount_state()
     
@@ -788,7 +1076,7 @@ class OperatorEditor:
                     
                     if success:
                         messagebox.showinfo("成功", f"已删除干员：{operator['name']}")
-                        self.refresh_operator_list()
+                        self._apply_operator_change(operator_id)
                         self.reset_form()
                         self.current_operator_id = None
                         self.is_editing = False
@@ -801,26 +1089,54 @@ class OperatorEditor:
             messagebox.showerror("错误", f"删除干员失败：{str(e)}")
     
     def on_class_type_changed(self, event=None):
-        """职业类型改变事件"""
-        self.update_heal_amount_state()
+        """职业类型改变事件（防抖处理）"""
+        if self._class_type_after_id is not None:
+            self.parent.after_cancel(self._class_type_after_id)
+        self._class_type_after_id = self.parent.after(FORM_DEBOUNCE_MS, self._do_class_type_changed)
+    
+    def _do_class_type_changed(self):
+        """处理职业类型改变"""
+        self._class_type_after_id = None
+        operator_vars = self.operator_vars
+        class_type = self.update_heal_amount_state(operator_vars['class_type'].get())
         # 如果是医疗干员且治疗量为空，自动填入攻击力
-        if (self.operator_vars['class_type'].get() == '医疗' and 
-            self.operator_vars['heal_amount'].get() == 0 and
-            self.operator_vars['atk'].get() > 0):
-            self.operator_vars['heal_amount'].set(self.operator_vars['atk'].get())
-    
-    def update_heal_amount_state(self):
-        """更新治疗量字段状态"""
-        if 'heal_amount' in self.operator_inputs:
-            widget = self.operator_inputs['heal_amount']
-            if self.operator_vars['class_type'].get() == '医疗':
+        if class_type == '医疗':
+            heal_amount_var = operator_vars['heal_amount']
+            atk = operator_vars['atk'].get()
+            if heal_amount_var.get() == 0 and atk > 0:
+                heal_amount_var.set(atk)
+    
+    def update_heal_amount_state(self, class_type=None):
+        """更新治疗量字段状态
+        
+        Args:
+            class_type: 当前职业类型，None表示从表单读取
+        Returns:
+            str: 当前职业类型，供调用方复用
+        """
+        operator_vars = self.operator_vars
+        if class_type is None:
+            class_type = operator_vars['class_type'].get()
+        
+        widget = self.operator_inputs.get('heal_amount')
+        if widget is not None:
+            if class_type == '医疗':
                 widget.configure(state='normal')
             else:
                 widget.configure(state='disabled')
-                self.operator_vars['heal_amount'].set(0)
+                operator_vars['heal_amount'].set(0)
+        
+        return class_type
     
     def validate_hit_count(self, *args):
-        """验证打数字段"""
+        """验证打数字段（防抖处理，避免输入过程中反复校验）"""
+        if self._hit_count_after_id is not None:
+            self.parent.after_cancel(self._hit_count_after_id)
+        self._hit_count_after_id = self.parent.after(FORM_DEBOUNCE_MS, self._do_validate_hit_count)
+    
+    def _do_validate_hit_count(self):
+        """执行打数字段校验"""
+        self._hit_count_after_id = None
         try:
             value = self.operator_vars['hit_count'].get()
             if value <= 0:
@@ -832,52 +1148,123 @@ class OperatorEditor:
         """显示实时计算预览"""
         try:
             # 获取当前表单数据
-            operator_data = {}
-            for key, var in self.operator_vars.items():
-                if isinstance(var, tk.StringVar):
-                    operator_data[key] = var.get().strip()
-                else:
-                    operator_data[key] = var.get()
-            
-            # 计算性能指标
-            performance = calculator.calculate_operator_performance(operator_data)
-            
-            # 创建预览窗口
-            preview_window = tk.Toplevel(self.parent)
-            preview_window.title(f"实时预览 - {operator_data.get('name', '未命名干员')}")
-            preview_window.geometry("400x300")
+            operator_data = self._get_form_data()
             
-            # 创建预览内容
-            preview_frame = ttk.LabelFrame(preview_window, text="性能指标", padding=10)
-            preview_frame.pack(fill=BOTH, expand=True, padx=10, pady=10)
+            # 预览窗口只创建一次，之后重复使用
+            if self._preview_window is None or not self._preview_window.winfo_exists():
+                self._build_preview_window()
             
-            metrics = [
-                ("DPS", f"{performance['dps']:.1f}"),
-                ("DPH", f"{performance['dph']:.1f}"),
-                ("HPS", f"{performance.get('hps', 0):.1f}"),
-                ("HPH", f"{performance.get('hph', 0):.1f}"),
-                ("破甲线", f"{performance['armor_break_point']}"),
-                ("生存能力", f"{performance['survivability']:.1f}"),
-                ("性价比", f"{performance['cost_efficiency']:.2f}")
-            ]
+            self._preview_window.title(f"实时预览 - {operator_data.get('name', '未命名干员')}")
+            # 计算完成前先显示提示
+            self._set_preview_values({key: "计算中…" for key, _, _ in PREVIEW_METRICS})
+            self._preview_window.deiconify()
+            self._preview_window.lift()
             
-            for i, (label, value) in enumerate(metrics):
-                ttk.Label(preview_frame, text=f"{label}:", font=("微软雅黑", 10, "bold")).grid(
-                    row=i, column=0, sticky='e', pady=3, padx=(0, 10))
-                ttk.Label(preview_frame, text=value, font=("微软雅黑", 10)).grid(
-                    row=i, column=1, sticky='w', pady=3)
-            
-            # 关闭按钮
-            ttk.Button(preview_window, text="关闭", command=preview_window.destroy).pack(pady=10)
+            # 在工作线程中计算性能指标（相同表单数据直接复用缓存结果）
+            future = self._preview_executor.submit(
+                _cached_performance, _performance_cache_key(operator_data)
+            )
+            future.add_done_callback(
+                lambda f: self.parent.after(0, self._on_preview_calculated, f)
+            )
             
         except Exception as e:
             messagebox.showerror("错误", f"生成预览失败：{str(e)}")
     
+    def _build_preview_window(self):
+        """创建预览窗口及各指标的显示控件"""
+        preview_window = tk.Toplevel(self.parent)
+        preview_window.geometry("400x300")
+        # 关闭时只隐藏窗口，下次预览直接复用
+        preview_window.protocol("WM_DELETE_WINDOW", preview_window.withdraw)
+        
+        # 创建预览内容
+        preview_frame = ttk.LabelFrame(preview_window, text="性能指标", padding=10)
+        preview_frame.pack(fill=BOTH, expand=True, padx=10, pady=10)
+        
+        # 所有指标显示在同一个两列Treeview中，每个指标一行（项目ID为指标键）
+        self._preview_tree = ttk.Treeview(preview_frame, columns=('value',), show='tree',
+                                          height=len(PREVIEW_METRICS), selectmode='none')
+        self._preview_tree.column('#0', width=120)
+        self._preview_tree.column('value', width=200)
+        for key, label, _ in PREVIEW_METRICS:
+            self._preview_tree.insert('', 'end', iid=key, text=label, values=('',))
+        self._preview_tree.pack(fill=BOTH, expand=True)
+        
+        # 关闭按钮
+        ttk.Button(preview_window, text="关闭", command=preview_window.withdraw).pack(pady=10)
+        
+        self._preview_window = preview_window
+    
+    def _on_preview_calculated(self, future):
+        """预览计算完成（主线程）"""
+        # 计算期间窗口可能已被销毁
+        if self._preview_window is None or not self._preview_window.winfo_exists():
+            return
+        
+        try:
+            performance = future.result()
+        except Exception as e:
+            self._preview_window.withdraw()
+            messagebox.showerror("错误", f"生成预览失败：{str(e)}")
+            return
+        
+        self._render_preview(performance)
+    
+    def _render_preview(self, performance):
+        """更新预览窗口中的性能指标"""
+        self._set_preview_values({
+            key: value_format.format(performance.get(key, 0))
+            for key, _, value_format in PREVIEW_METRICS
+        })
+    
+    def _set_preview_values(self, values):
+        """更新预览表格中的指标数值
+        
+        Args:
+            values: {指标键: 数值文本} 字典，只更新其中包含的指标行
+        """
+        for key, value in values.items():
+            self._preview_tree.item(key, values=(value,))
+    
+    def _invalidate_preview_metrics(self, metrics):
+        """标记需要刷新的预览指标（防抖处理，合并连续输入）"""
+        # 预览窗口未显示时无需计算
+        if self._preview_window is None or not self._preview_window.winfo_exists() \
+                or self._preview_window.state() == 'withdrawn':
+            return
+        
+        self._pending_preview_metrics.update(metrics)
+        if self._preview_metrics_after_id is not None:
+            self.parent.after_cancel(self._preview_metrics_after_id)
+        self._preview_metrics_after_id = self.parent.after(FORM_DEBOUNCE_MS, self._recompute_preview_metrics)
+    
+    def _recompute_preview_metrics(self):
+        """重新计算并更新受影响的预览指标"""
+        self._preview_metrics_after_id = None
+        metrics = self._pending_preview_metrics
+        self._pending_preview_metrics = set()
+        if self._preview_window is None or not self._preview_window.winfo_exists():
+            return
+        
+        try:
+            operator_data = self._get_form_data()
+        except (ValueError, tk.TclError):
+            # 输入尚未完成（如数值字段为空），保留当前显示
+            return
+        
+        performance = calculator.calculate_partial(operator_data, metrics)
+        self._set_preview_values({
+            key: value_format.format(performance[key])
+            for key, _, value_format in PREVIEW_METRICS
+            if key in performance
+        })
+    
     def update_status(self, message):
         """更新状态信息"""
         if self.status_callback:
             self.status_callback(message)
-        print(f"OperatorEditor: {message}")  # 调试输出
+        logger.debug("OperatorEditor: %s", message)
     
     def get_edit_mode_info(self):
         """获取当前编辑模式信息"""
@@ -904,52 +1291,116 @@ class OperatorEditor:
                   command=self.batch_delete).pack(side=LEFT, padx=2)
     
     def batch_import(self):
-        """批量导入干员"""
-        messagebox.showinfo("提示", "批量导入功能开发中...")
+        """从CSV文件批量导入干员"""
+        file_path = filedialog.askopenfilename(
+            title="批量导入干员",
+            filetypes=[("CSV文件", "*.csv"), ("所有文件", "*.*")]
+        )
+        if not file_path:
+            return
+        
+        try:
+            operators, errors = self._parse_import_file(file_path)
+            if not operators:
+                messagebox.showwarning("警告", "文件中没有可导入的干员\n" + "\n".join(errors[:10]))
+                return
+            
+            # 所有干员在一个事务中批量插入
+            result = self.db_manager.bulk_insert_operators(operators)
+            self.refresh_operator_list()
+            
+            message = f"成功导入 {result['inserted']} 个干员"
+            if result['skipped']:
+                message += f"，跳过 {len(result['skipped'])} 个重名干员"
+            if errors:
+                message += f"，{len(errors)} 行解析失败"
+            self.update_status(message)
+            messagebox.showinfo("成功", message)
+            
+        except Exception as e:
+            messagebox.showerror("错误", f"批量导入失败：{str(e)}")
+    
+    def _parse_import_file(self, file_path):
+        """解析导入文件，返回(干员列表, 错误信息列表)"""
+        return CsvHandler().import_from_csv(file_path)
     
     def batch_export(self):
-        """批量导出干员"""
-        messagebox.showinfo("提示", "批量导出功能开发中...")
+        """批量导出所有干员及其性能指标到CSV"""
+        operators = self.db_manager.get_all_operators()
+        if not operators:
+            messagebox.showwarning("警告", "没有数据可导出")
+            return
+        
+        try:
+            file_path = filedialog.asksaveasfilename(
+                title="批量导出干员",
+                defaultextension=".csv",
+                filetypes=[("CSV文件", "*.csv"), ("所有文件", "*.*")]
+            )
+            
+            if file_path:
+                # 一次向量化计算所有干员的性能指标
+                metrics = calculator.calculate_batch(operators)
+                
+                df = pd.DataFrame({
+                    'ID': [operator['id'] for operator in operators],
+                    '名称': [operator['name'] for operator in operators],
+                    '职业': [operator['class_type'] for operator in operators]
+                })
+                for key, label, _ in PREVIEW_METRICS:
+                    df[label] = metrics[key]
+                
+                df.to_csv(file_path, index=False, encoding='utf-8-sig')
+                
+                self.update_status(f"已导出 {len(operators)} 个干员到 {file_path}")
+                messagebox.showinfo("成功", f"数据已导出到:\n{file_path}")
+                
+        except Exception as e:
+            messagebox.showerror("错误", f"批量导出失败：{str(e)}")
     
     def batch_delete(self):
-        """批量删除干员"""
-        messagebox.showinfo("提示", "批量删除功能开发中...")
+        """批量删除选中的干员"""
+        # 项目ID即干员ID，无需逐行读取单元格；跳过"未找到"提示行等非干员行
+        operator_ids = [int(item) for item in self.operator_treeview.selection() if item.isdigit()]
+        if not operator_ids:
+            messagebox.showwarning("警告", "请先选择要删除的干员")
+            return
+        
+        result = messagebox.askyesno("确认删除", f"确定要删除选中的 {len(operator_ids)} 个干员吗？此操作不可恢复。")
+        if not result:
+            return
+        
+        try:
+            deleted = self.db_manager.delete_operators(operator_ids)
+            
+            self.refresh_operator_list()
+            if self.current_operator_id in operator_ids:
+                self.reset_form()
+                self.current_operator_id = None
+                self.is_editing = False
+                self.update_edit_status("查看模式", "blue")
+            self.update_status(f"已删除 {deleted} 个干员")
+            messagebox.showinfo("成功", f"已删除 {deleted} 个干员")
+            
+        except Exception as e:
+            messagebox.showerror("错误", f"批量删除失败：{str(e)}")
 
     def delete_all_operators_ui(self):
         """清空所有干员"""
-        # 获取当前干员数量
-        operators = self.db_manager.get_all_operators()
-        operator_count = len(operators)
+        # 获取当前干员数量：已加载的列表仍是最新时直接使用，否则只做COUNT查询
+        if self.db_manager.get_data_version() == self._db_version_seen:
+            operator_count = len(self.all_operators)
+        else:
+            operator_count = self.db_manager.count_operators()
         
         if operator_count == 0:
             messagebox.showinfo("提示", "当前没有干员数据需要删除")
             return
         
-        # 第一次确认
-        first_confirm = messagebox.askyesno(
-            "危险操作确认", 
-            f"⚠️ 您即将删除所有 {operator_count} 个干员数据！\n\n"
-            "此操作将：\n"
-            "• 删除所有干员信息\n"
-            "• 删除相关的计算记录\n"
-            "• 重置ID序列\n\n"
-            "⚠️ 此操作不可恢复！\n\n"
-            "确定要继续吗？"
-        )
-        
-        if not first_confirm:
-            return
-        
-        # 第二次确认 - 输入确认文本
-        from tkinter import simpledialog
-        confirm_text = simpledialog.askstring(
-            "最终确认",
-            "请输入 'DELETE ALL' 来确认删除所有干员：",
-            show='*'
-        )
-        
-        if confirm_text != 'DELETE ALL':
-            messagebox.showinfo("取消操作", "确认文本不正确，操作已取消")
+        # 风险提示和确认文本输入合并在一个对话框中
+        dialog = ConfirmDeleteAllDialog(self.parent, operator_count)
+        self.parent.wait_window(dialog)
+        if not dialog.confirmed:
             return
         
         try:
@@ -957,18 +1408,23 @@ class OperatorEditor:
             result = self.db_manager.delete_all_operators()
             
             if result['success']:
+                # 先完成界面更新并让Tk统一布局，再弹出阻塞的提示框
+                self._apply_post_delete_state()
+                self.parent.update_idletasks()
                 messagebox.showinfo("删除成功", result['message'])
                 
-                # 刷新界面
-                self.refresh_operator_list()
-                self.reset_form()
-                self.current_operator_id = None
-                self.is_editing = False
-                self.update_edit_status("查看模式", "blue")
-                self.update_status("已清空所有干员数据")
-                
             else:
                 messagebox.showerror("删除失败", result['message'])
                 
         except Exception as e:
-            messagebox.showerror("错误", f"删除所有干员失败：{str(e)}") 
\ No newline at end of file
+            messagebox.showerror("错误", f"删除所有干员失败：{str(e)}")
+    
+    def _apply_post_delete_state(self):
+        """清空所有干员后的界面状态更新"""
+        # 数据已清空，无需再查询数据库
+        self.refresh_operator_list(operators=[])
+        self.reset_form()
+        self.current_operator_id = None
+        self.is_editing = False
+        self.update_edit_status("查看模式", "blue")
+        self.update_status("已清空所有干员数据")
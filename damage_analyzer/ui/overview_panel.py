@@ -12,12 +12,29 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 import datetime
+import heapq
+from collections import deque
+import itertools
+import math
+import re
+import threading
+import time
 
 # 添加项目路径
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 logger = logging.getLogger(__name__)
 
+# 活动记录中的时间戳：日期、时分，可选的秒和微秒
+# 活动时间线最多显示的条数
+ACTIVITY_DISPLAY_LIMIT = 6
+
+TIMESTAMP_PATTERN = re.compile(r'(\d{4})-(\d{2})-(\d{2}) (\d{2}):(\d{2})(?::(\d{2})(?:\.(\d{1,6}))?)?')
+
+# 自动刷新间隔（毫秒），以及距上次刷新不足该秒数时跳过自动刷新
+AUTO_REFRESH_INTERVAL_MS = 30000
+AUTO_REFRESH_MIN_GAP = 5.0
+
 class OverviewPanel:
     """概览面板 - 显示数据库统计和快速入口"""
     
@@ -39,10 +56,38 @@ class OverviewPanel:
         self.stats_data = {
             'total_operators': 0,
             'total_skills': 0,
+            'total_imports': 0,
+            'today_calculations': 0,
             'class_distribution': {},
             'recent_activity': []
         }
         
+        # 上次渲染时的统计数据和活动记录哈希，数据未变化时跳过重绘
+        self._last_stats_hash = None
+        self._last_activity_hash = None
+        
+        # 饼图的扇形和文字对象，标签集合不变时直接修改角度和文字
+        self._pie_wedges = None
+        self._pie_texts = None
+        self._pie_autotexts = None
+        self._pie_labels_sig = None
+        
+        # 自动刷新定时器及上次刷新完成的时间（time.monotonic）
+        self._refresh_after_id = None
+        self._last_refresh_ts = 0.0
+        
+        # 后台刷新状态：是否有查询进行中，以及等待刷新结束的回调
+        self._refresh_in_flight = False
+        self._refresh_callbacks = []
+        # 查询进行中又收到的刷新请求：结束后再查询一次，其回调等那次查询结束再通知
+        self._refresh_pending = False
+        self._pending_callbacks = []
+        self._destroyed = False  # 父容器已销毁后不再刷新
+        self._needs_refresh = False  # 面板不可见期间数据可能已变化，显示时需要刷新
+        self._last_temp_activity_mtime = 0  # 上次处理的临时活动记录文件的修改时间
+        # 最近推送的实时活动（时间, 描述），按时间从新到旧排列；重建时间线时一并合并显示
+        self._pushed_activities = deque(maxlen=ACTIVITY_DISPLAY_LIMIT)
+        
         self.setup_ui()
         # 初始化后自动刷新数据
         self.parent.after(100, self.refresh_data)  # 延迟100ms执行
@@ -51,17 +96,66 @@ class OverviewPanel:
     
     def setup_auto_refresh(self):
         """设置自动刷新机制"""
-        def auto_refresh():
-            try:
-                self.refresh_data()
-            except Exception as e:
-                logger.error(f"自动刷新失败: {e}")
-            finally:
-                # 30秒后再次刷新
-                self.parent.after(30000, auto_refresh)
+        # 父容器销毁时取消定时器，避免回调作用于已销毁的控件
+        self.parent.bind('<Destroy>', self._on_destroy, add='+')
+        # 切换回概览标签页时补上不可见期间跳过的刷新
+        self.parent.bind('<Map>', self._on_visible, add='+')
         
         # 30秒后开始第一次自动刷新
-        self.parent.after(30000, auto_refresh)
+        self._schedule_auto_refresh()
+    
+    def _on_destroy(self, event):
+        """父容器销毁时停止自动刷新"""
+        # 子控件的销毁事件也可能传到这里，只处理父容器本身
+        if event.widget is not self.parent:
+            return
+        self._destroyed = True
+        if self._refresh_after_id is not None:
+            self.parent.after_cancel(self._refresh_after_id)
+            self._refresh_after_id = None
+    
+    def _schedule_auto_refresh(self):
+        """(重新)安排下一次自动刷新，取消尚未执行的定时器"""
+        if self._refresh_after_id is not None:
+            self.parent.after_cancel(self._refresh_after_id)
+            self._refresh_after_id = None
+        if not self._destroyed:
+            self._refresh_after_id = self.parent.after(AUTO_REFRESH_INTERVAL_MS, self._auto_refresh)
+    
+    def _auto_refresh(self):
+        """定时自动刷新"""
+        self._refresh_after_id = None
+        if self._destroyed:
+            return
+        try:
+            if not self.parent.winfo_viewable():
+                # 面板不可见时不查询也不重绘，等再次显示时刷新
+                self._needs_refresh = True
+            elif time.monotonic() - self._last_refresh_ts >= AUTO_REFRESH_MIN_GAP:
+                # 刚刷新过（如用户手动刷新）时跳过本次
+                self.refresh_data()
+        except Exception as e:
+            logger.error(f"自动刷新失败: {e}")
+        finally:
+            # 30秒后再次刷新
+            self._schedule_auto_refresh()
+    
+    def _on_visible(self, event):
+        """面板重新显示时，如有跳过的刷新则立即刷新"""
+        if event.widget is not self.parent or not self._needs_refresh:
+            return
+        self._needs_refresh = False
+        self.refresh_data()
+    
+    def mark_dirty(self):
+        """通知面板数据已变化
+        
+        面板可见时立即刷新，否则记录下来，等面板显示时再刷新。
+        """
+        if self.parent.winfo_viewable():
+            self.refresh_data()
+        else:
+            self._needs_refresh = True
     
     def set_main_window(self, main_window):
         """设置主窗口引用"""
@@ -114,9 +208,12 @@ class OverviewPanel:
         cards_frame.pack(fill=X)
         
         # 简化为3个核心统计卡片 - 单行布局
-        self.create_stat_card(cards_frame, "干员总数", "0", "👥", 0, 0)
-        self.create_stat_card(cards_frame, "导入记录", "0", "📁", 0, 1)
-        self.create_stat_card(cards_frame, "今日计算", "0", "📈", 0, 2)
+        # 数值标签按 干员总数、导入记录、今日计算 的顺序保存，刷新时直接更新文字
+        self._stat_labels = (
+            self.create_stat_card(cards_frame, "干员总数", "0", "👥", 0, 0),
+            self.create_stat_card(cards_frame, "导入记录", "0", "📁", 0, 1),
+            self.create_stat_card(cards_frame, "今日计算", "0", "📈", 0, 2)
+        )
         
         # 添加刷新数据按钮
         refresh_frame = ttk.Frame(stats_frame)
@@ -130,7 +227,7 @@ class OverviewPanel:
         self.refresh_btn = refresh_btn
     
     def create_stat_card(self, parent, title, value, icon, row, col):
-        """创建统计卡片"""
+        """创建统计卡片，返回显示数值的标签"""
         card_frame = ttk.Frame(parent, bootstyle="light")
         card_frame.grid(row=row, column=col, padx=10, pady=5, sticky="ew")
         
@@ -152,19 +249,7 @@ class OverviewPanel:
         title_label = ttk.Label(card_frame, text=title, font=("微软雅黑", 10))
         title_label.pack(anchor=W, pady=(0, 10))
         
-        # 标题到英文属性名的映射
-        title_mapping = {
-            "干员总数": "operators_count",
-            "导入记录": "imports_count", 
-            "今日计算": "today_calcs_count"
-        }
-        
-        # 使用英文属性名存储引用以便更新
-        attr_name = f"{title_mapping.get(title, title)}_value_label"
-        setattr(self, attr_name, value_label)
-        
-        # 调试信息
-        logger.info(f"创建统计卡片: {title} -> {attr_name}")
+        return value_label
     
     def create_charts_section(self, parent):
         """创建图表区域"""
@@ -197,6 +282,8 @@ class OverviewPanel:
         # 创建matplotlib图表
         self.class_fig = Figure(figsize=(4, 3), dpi=80)
         self.class_ax = self.class_fig.add_subplot(111)
+        # 边距只设置一次，更新图表时不再调用tight_layout
+        self.class_fig.subplots_adjust(left=0.05, right=0.95, top=0.9, bottom=0.05)
         
         self.class_canvas = FigureCanvasTkAgg(self.class_fig, chart_frame)
         self.class_canvas.get_tk_widget().pack(fill=BOTH, expand=True)
@@ -223,33 +310,45 @@ class OverviewPanel:
     def refresh_data_with_feedback(self):
         """带用户反馈的刷新数据方法 - 优化版"""
         try:
-            logger.info("用户点击刷新按钮，开始刷新数据...")
+            logger.debug("用户点击刷新按钮，开始刷新数据...")
             
             # 显示刷新状态
             original_text = self.refresh_btn.cget('text')
             self.refresh_btn.configure(text="⏳ 刷新中...", state="disabled")
             self.update_status("正在刷新数据...")
             
-            # 强制更新UI以显示刷新状态
-            self.parent.update_idletasks()
-            
             # 记录刷新前的数据状态
-            old_stats = self.stats_data.copy()
-            logger.info(f"刷新前数据状态: {old_stats}")
+            old_counts = (self.stats_data['total_operators'], self.stats_data['total_imports'],
+                          self.stats_data['today_calculations'])
             
-            # 执行刷新
-            self.refresh_data()
-            
-            # 记录刷新后的数据状态
-            logger.info(f"刷新后数据状态: {self.stats_data}")
+            # 执行刷新，并用手动刷新替代即将到期的自动刷新
+            self.refresh_data(on_complete=lambda error: self._on_manual_refresh_done(error, old_counts, original_text))
+            self._schedule_auto_refresh()
             
+        except Exception as e:
+            self._on_manual_refresh_done(e, None, None)
+    
+    def _on_manual_refresh_done(self, error, old_counts, original_text):
+        """手动刷新完成后的用户反馈（主线程）
+        
+        Args:
+            error: 刷新失败时的异常，成功时为None
+            old_counts: 刷新前的 (干员总数, 导入记录数, 今日计算次数)
+            original_text: 刷新按钮原来的文字
+        """
+        if error is None:
             # 检查数据是否有变化
+            old_ops, old_imp, old_today = old_counts
+            new_ops = self.stats_data['total_operators']
+            new_imp = self.stats_data['total_imports']
+            new_today = self.stats_data['today_calculations']
             changes = []
-            for key in ['total_operators', 'total_imports', 'today_calculations']:
-                old_val = old_stats.get(key, 0)
-                new_val = self.stats_data.get(key, 0)
-                if old_val != new_val:
-                    changes.append(f"{key}: {old_val} -> {new_val}")
+            if old_ops != new_ops:
+                changes.append(f"total_operators: {old_ops} -> {new_ops}")
+            if old_imp != new_imp:
+                changes.append(f"total_imports: {old_imp} -> {new_imp}")
+            if old_today != new_today:
+                changes.append(f"today_calculations: {old_today} -> {new_today}")
             
             # 显示成功状态
             self.refresh_btn.configure(text="✅ 刷新完成", state="normal")
@@ -263,41 +362,82 @@ class OverviewPanel:
                 success_msg = "数据已成功刷新！\n\n没有检测到数据变化。"
             
             messagebox.showinfo("刷新成功", success_msg)
-            logger.info(f"刷新成功，数据变化: {changes}")
-            
+            logger.debug("刷新成功，数据变化: %s", changes)
+            return
+        
+        logger.error(f"刷新数据失败: {error}", exc_info=error)
+        
+        # 恢复按钮状态
+        try:
+            self.refresh_btn.configure(text="❌ 刷新失败", state="normal")
+            self.parent.after(3000, lambda: self.refresh_btn.configure(text="🔄 刷新数据"))
+        except:
+            pass
+        
+        # 显示详细错误信息
+        error_msg = f"刷新数据时出现错误：\n\n{str(error)}\n\n请检查日志文件获取更多详细信息。"
+        messagebox.showerror("刷新失败", error_msg)
+    
+    def refresh_data(self, on_complete: Optional[Callable] = None):
+        """刷新数据统计 - 修复版本
+        
+        数据库查询在后台线程中执行，结果通过after(0)交回主线程更新界面。
+        刷新进行中时再次调用不会并发查询，而是在当前查询结束后再查询一次，
+        多次调用合并为一次，保证查询开始后发生的数据变化也能显示。
+        
+        Args:
+            on_complete: 刷新结束后在主线程调用on_complete(error)，成功时error为None
+        """
+        if self._refresh_in_flight:
+            self._refresh_pending = True
+            if on_complete is not None:
+                self._pending_callbacks.append(on_complete)
+            return
+        
+        if on_complete is not None:
+            self._refresh_callbacks.append(on_complete)
+        self._start_refresh()
+    
+    def _start_refresh(self):
+        """启动后台查询线程"""
+        logger.debug("开始刷新概览数据...")
+        self._refresh_in_flight = True
+        threading.Thread(target=self._fetch_refresh, daemon=True).start()
+    
+    def _fetch_refresh(self):
+        """在后台线程中获取概览数据（不访问任何Tk控件）"""
+        try:
+            # 统计摘要和最近活动在一次数据库调用中获取，连接失败时直接抛出异常
+            bundle = self.db_manager.get_overview_bundle()
         except Exception as e:
-            logger.error(f"刷新数据失败: {e}", exc_info=True)
-            
-            # 恢复按钮状态
-            try:
-                self.refresh_btn.configure(text="❌ 刷新失败", state="normal")
-                self.parent.after(3000, lambda: self.refresh_btn.configure(text="🔄 刷新数据"))
-            except:
-                pass
-            
-            # 显示详细错误信息
-            error_msg = f"刷新数据时出现错误：\n\n{str(e)}\n\n请检查日志文件获取更多详细信息。"
-            messagebox.showerror("刷新失败", error_msg)
+            self._post_to_ui(self._refresh_failed, e)
+            return
+        self._post_to_ui(self._apply_refresh, bundle)
     
-    def refresh_data(self):
-        """刷新数据统计 - 修复版本"""
+    def _post_to_ui(self, func, *args):
+        """从后台线程把结果交回主线程；交付失败（如窗口已关闭）时复位刷新状态"""
         try:
-            logger.info("开始刷新概览数据...")
-            
-            # 不要调用close()，因为SQLite的DatabaseManager不需要显式关闭单个连接
-            # 每次get_connection()都会创建新的连接
-            
-            # 测试数据库连接
-            if not self.db_manager.test_connection():
-                raise Exception("数据库连接失败")
-            
-            # 强制清除可能的缓存，重新获取统计数据
-            logger.info("正在获取最新统计数据...")
-            stats_summary = self.db_manager.get_statistics_summary()
-            logger.info(f"获取到统计数据: {stats_summary}")
+            self.parent.after(0, func, *args)
+        except Exception as e:
+            logger.warning(f"无法将刷新结果交回界面线程: {e}")
+            self._refresh_pending = False
+            self._refresh_in_flight = False
+    
+    def _apply_refresh(self, bundle):
+        """用获取到的数据更新界面（主线程）"""
+        if self._destroyed:
+            # 界面已不存在，丢弃结果和等待中的回调
+            self._refresh_in_flight = False
+            self._refresh_pending = False
+            self._refresh_callbacks = []
+            self._pending_callbacks = []
+            return
+        
+        try:
+            stats_summary = bundle['summary']
+            logger.debug("获取到统计数据: %s", stats_summary)
             
             # 更新内部数据
-            old_data = self.stats_data.copy()
             self.stats_data.update({
                 'total_operators': stats_summary.get('total_operators', 0),
                 'total_imports': stats_summary.get('total_imports', 0),
@@ -305,23 +445,30 @@ class OverviewPanel:
                 'class_distribution': stats_summary.get('class_distribution', {})
             })
             
-            # 记录所有数据变化
-            for key in ['total_operators', 'total_imports', 'today_calculations']:
-                old_val = old_data.get(key, 0)
-                new_val = self.stats_data[key]
-                if old_val != new_val:
-                    logger.info(f"{key}数量变化: {old_val} -> {new_val}")
-            
-            # 强制更新UI显示
-            logger.info("开始更新UI组件...")
-            self.update_stat_cards()
-            logger.info("统计卡片更新完成")
-            
-            self.update_class_distribution_chart()
-            logger.info("职业分布图表更新完成")
-            
-            self.update_activity_timeline()
-            logger.info("活动时间线更新完成")
+            # 只在数据变化时更新UI组件（饼图重绘是空闲刷新的主要开销）
+            logger.debug("开始更新UI组件...")
+            stats_hash = hash((
+                self.stats_data['total_operators'],
+                self.stats_data['total_imports'],
+                self.stats_data['today_calculations'],
+                tuple(sorted(self.stats_data['class_distribution'].items()))
+            ))
+            if stats_hash != self._last_stats_hash:
+                self.update_stat_cards()
+                logger.debug("统计卡片更新完成")
+                
+                self.update_class_distribution_chart()
+                logger.debug("职业分布图表更新完成")
+                self._last_stats_hash = stats_hash
+            
+            activity_hash = hash((
+                tuple((record.get('created_at'), record.get('record_count')) for record in bundle['imports']),
+                tuple((record.get('created_at'), record.get('operator_name')) for record in bundle['calcs'])
+            ))
+            if activity_hash != self._last_activity_hash:
+                self.update_activity_timeline(bundle['imports'], bundle['calcs'])
+                logger.debug("活动时间线更新完成")
+                self._last_activity_hash = activity_hash
             
             # 检查是否有临时活动记录需要处理
             self._check_and_process_temp_activity()
@@ -331,116 +478,80 @@ class OverviewPanel:
             
             # 更新状态显示
             self.update_status("数据刷新完成")
+            self._last_refresh_ts = time.monotonic()
             
-            logger.info(f"概览数据刷新完成: 干员数量={self.stats_data['total_operators']}, 导入记录={self.stats_data['total_imports']}, 今日计算={self.stats_data['today_calculations']}")
+            logger.info("概览数据刷新完成: 干员数量=%s, 导入记录=%s, 今日计算=%s",
+                        self.stats_data['total_operators'], self.stats_data['total_imports'],
+                        self.stats_data['today_calculations'])
             
         except Exception as e:
-            error_msg = f"刷新概览数据失败: {e}"
-            logger.error(error_msg)
-            self.update_status("数据刷新失败", "error")
-            raise e  # 重新抛出异常，让调用方处理
+            self._refresh_failed(e)
+            return
+        
+        self._finish_refresh(None)
+    
+    def _refresh_failed(self, error):
+        """刷新失败（主线程）"""
+        logger.error(f"刷新概览数据失败: {error}")
+        self.update_status("数据刷新失败", "error")
+        self._finish_refresh(error)
+    
+    def _finish_refresh(self, error):
+        """结束本次刷新并通知登记的回调"""
+        self._refresh_in_flight = False
+        callbacks = self._refresh_callbacks
+        self._refresh_callbacks = []
+        for callback in callbacks:
+            callback(error)
+        
+        # 查询期间又有刷新请求时，再查询一次以显示最新数据
+        if self._refresh_pending and not self._destroyed:
+            self._refresh_pending = False
+            self._refresh_callbacks = self._pending_callbacks
+            self._pending_callbacks = []
+            self._start_refresh()
     
     def _check_and_process_temp_activity(self):
         """检查并处理临时活动记录"""
         try:
             activity_file = "temp_activity.txt"
-            if os.path.exists(activity_file):
-                with open(activity_file, "r", encoding="utf-8") as f:
-                    activity_description = f.read().strip()
-                
-                if activity_description:
-                    logger.info(f"处理临时活动记录: {activity_description}")
-                    self.push_real_time_activity(activity_description)
-                
-                # 删除临时文件
-                os.remove(activity_file)
-                logger.info("临时活动记录文件已删除")
+            # 一次stat同时判断文件是否存在以及是否为新写入的内容
+            try:
+                mtime = os.stat(activity_file).st_mtime_ns
+            except FileNotFoundError:
+                return
+            if mtime == self._last_temp_activity_mtime:
+                return
+            self._last_temp_activity_mtime = mtime
+            
+            with open(activity_file, "r", encoding="utf-8") as f:
+                activity_description = f.read().strip()
+            
+            if activity_description:
+                logger.info(f"处理临时活动记录: {activity_description}")
+                self.push_real_time_activity(activity_description)
+            
+            # 删除临时文件
+            os.remove(activity_file)
+            logger.info("临时活动记录文件已删除")
                 
         except Exception as e:
             logger.error(f"处理临时活动记录失败: {e}")
     
     def update_stat_cards(self):
-        """更新统计卡片 - 修复版本"""
+        """更新统计卡片"""
+        operators_label, imports_label, today_label = self._stat_labels
         try:
-            logger.info("开始更新统计卡片...")
-            logger.info(f"当前统计数据: {self.stats_data}")
-            
-            # 检查所有应该存在的属性
-            expected_attrs = ['operators_count_value_label', 'imports_count_value_label', 'today_calcs_count_value_label']
-            missing_attrs = []
-            for attr in expected_attrs:
-                if not hasattr(self, attr):
-                    missing_attrs.append(attr)
-            
-            if missing_attrs:
-                logger.error(f"缺少属性: {missing_attrs}")
-                logger.info("尝试重新创建统计区域...")
-                return
-            
-            # 更新干员总数
-            if hasattr(self, 'operators_count_value_label'):
-                try:
-                    old_value = self.operators_count_value_label.cget('text')
-                    new_value = str(self.stats_data['total_operators'])
-                    self.operators_count_value_label.configure(text=new_value)
-                    logger.info(f"干员总数更新: {old_value} -> {new_value}")
-                except Exception as e:
-                    logger.error(f"更新干员总数失败: {e}")
-            else:
-                logger.warning("operators_count_value_label 属性不存在")
-            
-            # 更新导入记录统计
-            if hasattr(self, 'imports_count_value_label'):
-                try:
-                    old_value = self.imports_count_value_label.cget('text')
-                    new_value = str(self.stats_data['total_imports'])
-                    self.imports_count_value_label.configure(text=new_value)
-                    logger.info(f"导入记录更新: {old_value} -> {new_value}")
-                except Exception as e:
-                    logger.error(f"更新导入记录失败: {e}")
-            else:
-                logger.warning("imports_count_value_label 属性不存在")
-            
-            # 更新今日计算统计
-            if hasattr(self, 'today_calcs_count_value_label'):
-                try:
-                    old_value = self.today_calcs_count_value_label.cget('text')
-                    new_value = str(self.stats_data['today_calculations'])
-                    self.today_calcs_count_value_label.configure(text=new_value)
-                    logger.info(f"今日计算更新: {old_value} -> {new_value}")
-                except Exception as e:
-                    logger.error(f"更新今日计算失败: {e}")
-            else:
-                logger.warning("today_calcs_count_value_label 属性不存在")
-            
-            # 强制更新UI显示
-            try:
-                self.parent.update_idletasks()
-                
-                # 强制刷新每个label
-                for attr_name in expected_attrs:
-                    if hasattr(self, attr_name):
-                        widget = getattr(self, attr_name)
-                        widget.update_idletasks()
-                        
-                logger.info("UI强制更新完成")
-            except Exception as e:
-                logger.error(f"强制UI更新失败: {e}")
-            
-            logger.info("统计卡片更新完成")
-                    
+            operators_label.configure(text=str(self.stats_data['total_operators']))
+            imports_label.configure(text=str(self.stats_data['total_imports']))
+            today_label.configure(text=str(self.stats_data['today_calculations']))
         except Exception as e:
             logger.error(f"更新统计卡片失败: {e}")
             # 显示错误状态
-            try:
-                if hasattr(self, 'operators_count_value_label'):
-                    self.operators_count_value_label.configure(text="错误")
-                if hasattr(self, 'imports_count_value_label'):
-                    self.imports_count_value_label.configure(text="错误")
-                if hasattr(self, 'today_calcs_count_value_label'):
-                    self.today_calcs_count_value_label.configure(text="错误")
-            except Exception as inner_e:
-                logger.error(f"设置错误状态失败: {inner_e}")
+            for label in self._stat_labels:
+                label.configure(text="错误")
+        
+        self.parent.update_idletasks()
     
     def get_import_records_count(self) -> int:
         """获取导入记录数量"""
@@ -456,131 +567,147 @@ class OverviewPanel:
             logger.error(f"获取导入记录数量失败: {e}")
             return 0
     
-    def get_today_calculations_count(self) -> int:
-        """获取今日计算次数"""
-        try:
-            # 使用数据库管理器的新方法获取今日计算记录
-            if hasattr(self.db_manager, 'get_today_calculations'):
-                return self.db_manager.get_today_calculations()
-            else:
-                # 兼容性处理：使用日志文件统计
-                return self.count_today_calculations_from_log()
-        except Exception as e:
-            logger.error(f"获取今日计算次数失败: {e}")
-            return 0
-    
-    def count_today_calculations_from_log(self) -> int:
-        """从日志文件统计今日计算次数"""
-        try:
-            today = datetime.date.today()
-            log_file = "damage_analyzer.log"
-            
-            if not os.path.exists(log_file):
-                return 0
-            
-            calculation_count = 0
-            with open(log_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    # 查找包含计算相关的日志条目
-                    if any(keyword in line for keyword in ['计算', 'calculate', 'DPS', '伤害分析']):
-                        # 检查是否是今天的日志
-                        if today.strftime('%Y-%m-%d') in line:
-                            calculation_count += 1
-            
-            return calculation_count
-            
-        except Exception as e:
-            logger.error(f"从日志统计今日计算次数失败: {e}")
-            return 0
-    
     def update_class_distribution_chart(self):
         """更新职业分布图表"""
         try:
+            distribution = self.stats_data['class_distribution']
+            labels_sig = tuple(distribution.keys())
+            
+            if distribution and labels_sig == self._pie_labels_sig:
+                # 职业集合未变化：复用已有的扇形和文字，只更新角度和百分比
+                self._update_pie_artists(list(distribution.values()))
+                self.class_canvas.draw_idle()
+                return
+            
             self.class_ax.clear()
             
-            distribution = self.stats_data['class_distribution']
             if distribution:
-                labels = list(distribution.keys())
+                labels = list(labels_sig)
                 sizes = list(distribution.values())
                 colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD', '#98D8C8', '#F7DC6F']
                 
-                self.class_ax.pie(sizes, labels=labels, autopct='%1.1f%%', 
-                                 colors=colors[:len(labels)], startangle=90)
+                self._pie_wedges, self._pie_texts, self._pie_autotexts = self.class_ax.pie(
+                    sizes, labels=labels, autopct='%1.1f%%',
+                    colors=colors[:len(labels)], startangle=90)
+                self._pie_labels_sig = labels_sig
                 self.class_ax.set_title('干员职业分布', fontsize=10, fontweight='bold')
             else:
+                self._pie_wedges = self._pie_texts = self._pie_autotexts = None
+                self._pie_labels_sig = None
                 self.class_ax.text(0.5, 0.5, '暂无数据', ha='center', va='center', 
                                   transform=self.class_ax.transAxes)
                 self.class_ax.set_title('干员职业分布', fontsize=10, fontweight='bold')
             
-            self.class_fig.tight_layout()
-            self.class_canvas.draw()
+            self.class_canvas.draw_idle()
             
         except Exception as e:
             logger.error(f"更新职业分布图表失败: {e}")
     
-    def update_activity_timeline(self):
-        """更新活动时间线 - 修复版本"""
+    def _update_pie_artists(self, sizes: List[int]):
+        """按新的数量更新现有饼图扇形的角度、标签位置和百分比文字
+        
+        角度和文字位置的计算与Axes.pie一致（startangle=90，逆时针）。
+        """
+        total = sum(sizes)
+        theta1 = 90.0
+        for wedge, text, autotext, size in zip(self._pie_wedges, self._pie_texts,
+                                               self._pie_autotexts, sizes):
+            theta2 = theta1 + 360.0 * size / total
+            wedge.set_theta1(theta1)
+            wedge.set_theta2(theta2)
+            
+            theta_mid = math.radians((theta1 + theta2) / 2)
+            x, y = math.cos(theta_mid), math.sin(theta_mid)
+            # 标签位于半径1.1处，百分比位于半径0.6处（Axes.pie的默认距离）
+            text.set_position((1.1 * x, 1.1 * y))
+            text.set_horizontalalignment('left' if x > 0 else 'right')
+            autotext.set_position((0.6 * x, 0.6 * y))
+            autotext.set_text(f"{100.0 * size / total:.1f}%")
+            
+            theta1 = theta2
+    
+    def update_activity_timeline(self, import_records: Optional[List[Dict]] = None,
+                                 calc_records: Optional[List[Dict]] = None):
+        """更新活动时间线 - 修复版本
+        
+        Args:
+            import_records: 最近的导入记录，None表示从数据库查询
+            calc_records: 最近的计算记录，None表示从数据库查询
+        """
         try:
-            self.activity_listbox.delete(0, tk.END)
-            
             # 获取混合活动记录并按时间排序
-            import_records = self.db_manager.get_import_records(limit=5)
-            calc_records = self.db_manager.get_calculation_history(limit=5)
-            
-            # 合并并排序活动
-            all_activities = []
-            
-            # 添加导入记录
-            for record in import_records:
-                all_activities.append({
-                    'time': record.get('created_at', ''),
-                    'text': f"导入了{record.get('record_count', 0)}条数据",
-                    'type': 'import'
-                })
-            
-            # 添加计算记录
-            for record in calc_records:
-                all_activities.append({
-                    'time': record.get('created_at', ''),
-                    'text': f"计算了{record.get('operator_name', '未知干员')}的伤害",
-                    'type': 'calculation'
-                })
-            
-            # 按时间倒序排序（最新的在前）
-            all_activities.sort(key=lambda x: x['time'], reverse=True)
+            if import_records is None:
+                import_records = self.db_manager.get_import_records(limit=5)
+            if calc_records is None:
+                calc_records = self.db_manager.get_calculation_history(limit=5)
+            
+            # 两组记录都已按时间倒序返回，归并后取最近6条即可，无需整体排序
+            import_activities = ({
+                'time': record.get('created_at', ''),
+                'text': f"导入了{record.get('record_count', 0)}条数据",
+                'type': 'import'
+            } for record in import_records)
+            
+            calc_activities = ({
+                'time': record.get('created_at', ''),
+                'text': f"计算了{record.get('operator_name', '未知干员')}的伤害",
+                'type': 'calculation'
+            } for record in calc_records)
+            
+            # 实时推送的活动描述更具体，放在最前面以便同一时间的记录中优先显示
+            pushed_activities = ({
+                'time': pushed_time,
+                'text': description,
+                'type': 'pushed'
+            } for pushed_time, description in self._pushed_activities)
+            
+            recent_activities = list(itertools.islice(
+                heapq.merge(pushed_activities, import_activities, calc_activities,
+                            key=lambda x: x['time'], reverse=True), ACTIVITY_DISPLAY_LIMIT))
             
             # 显示最近6条活动
-            if all_activities:
-                for activity in all_activities[:6]:
-                    time_str = self._format_time_for_display(activity['time'])
-                    self.activity_listbox.insert(tk.END, f"• {time_str} {activity['text']}")
+            if recent_activities:
+                now = datetime.datetime.now()
+                lines = [
+                    f"• {self._format_time_for_display(activity['time'], now)} {activity['text']}"
+                    for activity in recent_activities
+                ]
             else:
                 # 如果没有活动记录，显示提示信息
                 current_time = datetime.datetime.now().strftime("%H:%M")
-                self.activity_listbox.insert(tk.END, f"• {current_time} 系统初始化完成")
-                self.activity_listbox.insert(tk.END, "• 请导入数据或进行计算")
-                self.activity_listbox.insert(tk.END, "• 数据将在此处显示")
+                lines = [
+                    f"• {current_time} 系统初始化完成",
+                    "• 请导入数据或进行计算",
+                    "• 数据将在此处显示"
+                ]
+            
+            # 一次调用插入所有行
+            self.activity_listbox.delete(0, tk.END)
+            self.activity_listbox.insert(tk.END, *lines)
                 
         except Exception as e:
             logger.error(f"更新活动时间线失败: {e}")
             # 显示错误信息
             self.activity_listbox.delete(0, tk.END)
             current_time = datetime.datetime.now().strftime("%H:%M")
-            self.activity_listbox.insert(tk.END, f"• {current_time} 活动记录更新失败")
-            self.activity_listbox.insert(tk.END, f"• 错误: {str(e)[:50]}...")
+            self.activity_listbox.insert(tk.END, f"• {current_time} 活动记录更新失败",
+                                         f"• 错误: {str(e)[:50]}...")
     
     def push_real_time_activity(self, activity_description: str):
         """推送实时活动记录 - 修复版本"""
         try:
             # 使用当前本地时间
-            current_time = datetime.datetime.now().strftime("%H:%M")
+            now = datetime.datetime.now()
+            current_time = now.strftime("%H:%M")
+            
+            # 记录下来，后台刷新重建时间线时不会被数据库中的通用描述覆盖
+            self._pushed_activities.appendleft((now.strftime("%Y-%m-%d %H:%M:%S"), activity_description))
             
             # 在活动列表顶部插入新活动
             self.activity_listbox.insert(0, f"• {current_time} {activity_description}")
             
-            # 保持列表长度不超过6条，删除最旧的记录
-            while self.activity_listbox.size() > 6:
-                self.activity_listbox.delete(tk.END)
+            # 保持列表长度不超过6条，一次删除所有更旧的记录
+            self.activity_listbox.delete(ACTIVITY_DISPLAY_LIMIT, tk.END)
             
             # 强制刷新显示
             self.activity_listbox.update_idletasks()
@@ -610,29 +737,30 @@ class OverviewPanel:
         """获取当前统计数据"""
         return self.stats_data.copy()
     
-    def _format_time_for_display(self, time_str: str) -> str:
+    def _format_time_for_display(self, time_str: str, now: Optional[datetime.datetime] = None) -> str:
         """统一的时间格式化方法 - 修复版本
         
         解决时间不一致问题，统一使用本地时间源
+        
+        Args:
+            time_str: 数据库或推送记录中的时间字符串
+            now: 当前本地时间，批量格式化时由调用方取一次后传入
         """
         try:
             if not time_str:
                 return "未知时间"
             
-            # 尝试解析不同的时间格式
-            time_formats = [
-                "%Y-%m-%d %H:%M:%S",     # 数据库标准格式
-                "%Y-%m-%d %H:%M",        # 推送时使用的格式
-                "%Y-%m-%d %H:%M:%S.%f"   # 带微秒的格式
-            ]
-            
+            # 支持 "%Y-%m-%d %H:%M:%S"（数据库标准格式）、"%Y-%m-%d %H:%M"（推送时使用的格式）
+            # 以及带微秒的格式，用预编译的正则直接取出各字段，不使用strptime
             parsed_time = None
-            for fmt in time_formats:
+            match = TIMESTAMP_PATTERN.fullmatch(time_str)
+            if match:
+                year, month, day, hour, minute, second, fraction = match.groups(default='0')
                 try:
-                    parsed_time = datetime.datetime.strptime(time_str, fmt)
-                    break
+                    parsed_time = datetime.datetime(int(year), int(month), int(day), int(hour),
+                                                    int(minute), int(second), int(fraction.ljust(6, '0')))
                 except ValueError:
-                    continue
+                    parsed_time = None
             
             if parsed_time is None:
                 # 如果都解析不了，截取前16个字符
@@ -641,7 +769,7 @@ class OverviewPanel:
             
             # 修复：检查数据库时间是否是UTC时间，如果是，转换为本地时间
             # 如果时间差距太大（比如8小时），可能是UTC时间，需要转换
-            current_local_time = datetime.datetime.now()
+            current_local_time = now or datetime.datetime.now()
             time_diff = abs((current_local_time - parsed_time).total_seconds())
             
             # 如果时间差超过6小时但小于10小时，可能是UTC时间需要转换
@@ -651,7 +779,7 @@ class OverviewPanel:
                 logger.debug(f"检测到UTC时间，已转换为本地时间: {time_str} -> {parsed_time}")
             
             # 检查是否是今天的时间
-            today = datetime.date.today()
+            today = current_local_time.date()
             if parsed_time.date() == today:
                 # 今天的时间只显示时分
                 return parsed_time.strftime("%H:%M")
@@ -3,13 +3,30 @@
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 import tkinter as tk
+import logging
 from typing import Dict, Callable, Optional
 from .components.theme_selector import ThemeSelector
 from .components.font_size_selector import FontSizeSelector
 
+logger = logging.getLogger(__name__)
+
 class SettingsDialog(ttk.Toplevel):
     """设置对话框"""
     
+    # 对话框初始尺寸（宽, 高）
+    DIALOG_SIZE = (600, 500)
+    
+    # 字体相关的设置项
+    _FONT_KEYS = frozenset({'font_size_preset', 'custom_font_scale', 'font_family'})
+    
+    # 界面设置默认值
+    _DEFAULT_UI_SETTINGS = {
+        'theme': 'cosmo',
+        'font_size_preset': 'medium',
+        'font_family': '微软雅黑',
+        'custom_font_scale': 1.0
+    }
+    
     def __init__(self, parent, config_manager, theme_manager, font_manager):
         """
         初始化设置对话框
@@ -30,26 +47,29 @@ class SettingsDialog(ttk.Toplevel):
         # 存储原始设置以便取消时恢复
         self.original_settings = self.config_manager.get_ui_settings()
         
+        # 最近一次已应用的设置，用于应用时跳过未变化的主题/字体
+        self._applied_settings = dict(self.original_settings)
+        
+        # 是否已有主题/字体被实际应用，取消时只在为True时回滚
+        self._dirty = False
+        
         # 存储组件引用
-        self.category_tree = None
-        self.content_frame = None
         self.theme_selector = None
         self.font_selector = None
-        self.current_panel = None
-        
-        # 设置对话框属性
-        self.setup_dialog_properties()
         
         # 创建界面
         self.setup_ui()
         
+        # 所有标签页添加完成后再设置对话框属性（含模态grab）
+        self.setup_dialog_properties()
+        
         # 居中显示
         self.center_dialog()
     
     def setup_dialog_properties(self):
         """设置对话框属性"""
         self.title("设置 - 塔防游戏伤害分析器")
-        self.geometry("600x500")
+        self.geometry("%dx%d" % self.DIALOG_SIZE)
         self.resizable(True, True)
         self.minsize(500, 400)
         
@@ -70,20 +90,47 @@ class SettingsDialog(ttk.Toplevel):
         self.notebook = ttk.Notebook(main_frame)
         self.notebook.pack(fill=BOTH, expand=True, pady=(0, 10))
         
+        # 标签页内容按需创建：先只添加空框架，首次切换到该页时再构建；
+        # 离开没有未应用修改的标签页时销毁其内容，再次显示时重新构建
+        self._tab_frames = {}
+        self._tab_builders = {}
+        self._tab_built = set()
+        self._tab_selectors = {}
+        self._tab_setting_keys = {}
+        self._current_tab_index = None
+        
         # 创建主题设置标签页
         self.create_theme_tab()
         
         # 创建字体设置标签页
         self.create_font_tab()
         
+        # 打开上次关闭对话框时所在的标签页
+        last_tab = self.original_settings.get('settings_last_tab', 0)
+        if last_tab in self._tab_frames:
+            self.notebook.select(self._tab_frames[last_tab])
+        
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+        
         # 底部按钮栏
         self.create_button_bar(main_frame)
+        
+        # 构建初始选中的标签页
+        self._current_tab_index = self.notebook.index("current")
+        self._build_tab(self._current_tab_index)
     
     def create_theme_tab(self):
-        """创建主题设置标签页"""
+        """创建主题设置标签页（内容在首次显示时构建）"""
         theme_frame = ttk.Frame(self.notebook)
         self.notebook.add(theme_frame, text="🎨 主题")
-        
+        index = self.notebook.index(theme_frame)
+        self._tab_frames[index] = theme_frame
+        self._tab_builders[index] = self._build_theme_tab
+        self._tab_selectors[index] = 'theme_selector'
+        self._tab_setting_keys[index] = frozenset({'theme'})
+    
+    def _build_theme_tab(self, theme_frame):
+        """构建主题设置标签页内容"""
         # 创建主题选择器
         self.theme_selector = ThemeSelector(
             theme_frame,
@@ -94,10 +141,17 @@ class SettingsDialog(ttk.Toplevel):
         self.theme_selector.pack(fill=BOTH, expand=True, padx=10, pady=10)
     
     def create_font_tab(self):
-        """创建字体设置标签页"""
+        """创建字体设置标签页（内容在首次显示时构建）"""
         font_frame = ttk.Frame(self.notebook)
         self.notebook.add(font_frame, text="🔤 字体")
-        
+        index = self.notebook.index(font_frame)
+        self._tab_frames[index] = font_frame
+        self._tab_builders[index] = self._build_font_tab
+        self._tab_selectors[index] = 'font_selector'
+        self._tab_setting_keys[index] = self._FONT_KEYS
+    
+    def _build_font_tab(self, font_frame):
+        """构建字体设置标签页内容"""
         # 创建字体选择器
         self.font_selector = FontSizeSelector(
             font_frame,
@@ -107,9 +161,43 @@ class SettingsDialog(ttk.Toplevel):
         )
         self.font_selector.pack(fill=BOTH, expand=True, padx=10, pady=10)
     
-    def create_category_tree(self, parent):
-        """创建分类树（已废弃，使用Notebook代替）"""
-        pass
+    def _on_tab_changed(self, event=None):
+        """标签页切换：卸载离开的标签页，构建新显示的标签页"""
+        index = self.notebook.index("current")
+        previous = self._current_tab_index
+        self._current_tab_index = index
+        
+        if previous is not None and previous != index:
+            self._unload_tab(previous)
+        self._build_tab(index)
+    
+    def _unload_tab(self, index):
+        """销毁标签页内容以释放组件，有未应用的修改时保留"""
+        if index not in self._tab_built:
+            return
+        
+        keys = self._tab_setting_keys.get(index, frozenset())
+        settings = self.collect_all_settings()
+        if any(k in settings and settings[k] != self._applied_settings.get(k) for k in keys):
+            return
+        
+        for child in self._tab_frames[index].winfo_children():
+            child.destroy()
+        setattr(self, self._tab_selectors[index], None)
+        self._tab_built.discard(index)
+    
+    def _remember_current_tab(self):
+        """记录当前标签页，下次打开对话框时直接显示该页"""
+        index = self._current_tab_index
+        if index is not None and index != self.original_settings.get('settings_last_tab', 0):
+            self.config_manager.update_ui_settings({'settings_last_tab': index})
+    
+    def _build_tab(self, index):
+        """构建指定标签页的内容（每页只构建一次）"""
+        if index in self._tab_built or index not in self._tab_builders:
+            return
+        self._tab_built.add(index)
+        self._tab_builders[index](self._tab_frames[index])
     
     def create_button_bar(self, parent):
         """创建底部按钮栏"""
@@ -164,74 +252,77 @@ class SettingsDialog(ttk.Toplevel):
         )
         reset_btn.pack(side=LEFT)
     
-    def on_category_select(self, event=None):
-        """分类选择处理（已废弃，使用Notebook代替）"""
-        pass
-    
-    def show_appearance_panel(self):
-        """显示外观设置面板（已废弃，使用Notebook代替）"""
-        pass
-    
-    def show_font_panel(self):
-        """显示字体设置面板（已废弃，使用Notebook代替）"""
-        pass
-    
-    def clear_content_frame(self):
-        """清空内容区域（已废弃，使用Notebook代替）"""
-        pass
-    
     def on_theme_change(self, theme_name):
         """主题变更回调"""
         try:
+            self._dirty = True
+            
             # 立即应用主题到当前对话框
             self.theme_manager.apply_theme_to_window(self, theme_name)
-            print(f"设置对话框主题变更: {theme_name}")
+            logger.debug("设置对话框主题变更: %s", theme_name)
         except Exception as e:
-            print(f"主题变更回调失败: {e}")
+            logger.error("主题变更回调失败: %s", e)
     
     def on_font_change(self, font_settings):
         """字体变更回调"""
         try:
+            self._dirty = True
+            
             # 可以在这里添加实时字体应用逻辑
-            print(f"设置对话框字体变更: {font_settings}")
+            logger.debug("设置对话框字体变更: %s", font_settings)
         except Exception as e:
-            print(f"字体变更回调失败: {e}")
+            logger.error("字体变更回调失败: %s", e)
     
     def apply_settings(self):
         """应用设置"""
         try:
             current_settings = self.collect_all_settings()
             
+            # 只处理与上次应用值不同的设置项
+            changed = {k: v for k, v in current_settings.items()
+                       if self._applied_settings.get(k) != v}
+            if not changed:
+                logger.debug("设置未变化，跳过应用")
+                return
+            
             # 更新配置
             self.config_manager.update_ui_settings(current_settings)
             
             # 应用到主题管理器
-            if 'theme' in current_settings:
+            if 'theme' in changed:
                 self.theme_manager.apply_theme(current_settings['theme'])
             
             # 使用安全的字体应用方法
-            font_settings = {k: v for k, v in current_settings.items() 
-                           if k in ['font_size_preset', 'custom_font_scale', 'font_family']}
-            if font_settings:
+            if not self._FONT_KEYS.isdisjoint(changed):
+                font_settings = {k: current_settings[k] for k in self._FONT_KEYS if k in current_settings}
                 self.font_manager.apply_font_settings_safely(font_settings)
             
-            print("设置应用成功")
+            self._applied_settings.update(current_settings)
+            self._dirty = True
+            logger.debug("设置应用成功: %s", changed)
             
         except Exception as e:
-            print(f"应用设置失败: {e}")
+            logger.error("应用设置失败: %s", e)
             tk.messagebox.showerror("错误", f"应用设置失败: {str(e)}")
     
     def save_and_close(self):
         """保存并关闭"""
         try:
             self.apply_settings()
+            self._remember_current_tab()
             self.destroy()
         except Exception as e:
-            print(f"保存设置失败: {e}")
+            logger.error("保存设置失败: %s", e)
     
     def cancel_and_close(self):
         """取消并关闭"""
         try:
+            # 未应用过任何修改时无需回滚
+            if not self._dirty:
+                self._remember_current_tab()
+                self.destroy()
+                return
+            
             # 恢复原始设置
             self.config_manager.update_ui_settings(self.original_settings)
             
@@ -240,17 +331,16 @@ class SettingsDialog(ttk.Toplevel):
             self.theme_manager.apply_theme(original_theme)
             
             # 使用安全的方法恢复字体设置
-            original_font_settings = {
-                'font_size_preset': self.original_settings.get('font_size_preset', 'medium'),
-                'custom_font_scale': self.original_settings.get('custom_font_scale', 1.0),
-                'font_family': self.original_settings.get('font_family', '微软雅黑')
-            }
+            original_font_settings = {k: self.original_settings.get(k, self._DEFAULT_UI_SETTINGS[k])
+                                      for k in self._FONT_KEYS}
             self.font_manager.apply_font_settings_safely(original_font_settings)
+            self._applied_settings = dict(self.original_settings)
+            self._remember_current_tab()
             
             self.destroy()
             
         except Exception as e:
-            print(f"取消设置失败: {e}")
+            logger.error("取消设置失败: %s", e)
             self.destroy()
     
     def reset_to_defaults(self):
@@ -265,12 +355,7 @@ class SettingsDialog(ttk.Toplevel):
             
             if result:
                 # 重置配置
-                default_ui_settings = {
-                    'theme': 'cosmo',
-                    'font_size_preset': 'medium',
-                    'font_family': '微软雅黑',
-                    'custom_font_scale': 1.0
-                }
+                default_ui_settings = dict(self._DEFAULT_UI_SETTINGS)
                 
                 self.config_manager.update_ui_settings(default_ui_settings)
                 
@@ -278,23 +363,21 @@ class SettingsDialog(ttk.Toplevel):
                 self.theme_manager.apply_theme('cosmo')
                 
                 # 使用安全的方法重置字体
-                default_font_settings = {
-                    'font_size_preset': 'medium',
-                    'custom_font_scale': 1.0,
-                    'font_family': '微软雅黑'
-                }
+                default_font_settings = {k: default_ui_settings[k] for k in self._FONT_KEYS}
                 self.font_manager.apply_font_settings_safely(default_font_settings)
+                self._applied_settings.update(default_ui_settings)
+                self._dirty = True
                 
-                # 刷新当前面板
-                if self.current_panel == 'appearance' and self.theme_selector:
+                # 刷新已构建的标签页
+                if self.theme_selector is not None:
                     self.theme_selector.load_current_theme()
-                elif self.current_panel == 'font' and self.font_selector:
+                if self.font_selector is not None:
                     self.font_selector.load_current_settings()
                 
-                print("设置已重置为默认值")
+                logger.debug("设置已重置为默认值")
                 
         except Exception as e:
-            print(f"重置设置失败: {e}")
+            logger.error("重置设置失败: %s", e)
     
     def collect_all_settings(self) -> Dict[str, any]:
         """收集所有设置"""
@@ -315,16 +398,13 @@ class SettingsDialog(ttk.Toplevel):
             return settings
             
         except Exception as e:
-            print(f"收集设置失败: {e}")
+            logger.error("收集设置失败: %s", e)
             return {}
     
     def center_dialog(self):
         """居中显示对话框"""
-        self.update_idletasks()
-        
-        # 获取对话框尺寸
-        dialog_width = self.winfo_width()
-        dialog_height = self.winfo_height()
+        # 对话框尺寸由setup_dialog_properties固定设置，无需刷新空闲任务再测量
+        dialog_width, dialog_height = self.DIALOG_SIZE
         
         # 获取父窗口位置和尺寸
         parent_x = self.parent_window.winfo_x()
@@ -5,11 +5,36 @@ from ttkbootstrap.constants import *
 import tkinter as tk
 from typing import Dict, Callable
 import logging
+import sqlite3
+import time
 from tkinter import messagebox
 from ui.invisible_scroll_frame import InvisibleScrollFrame
 
 logger = logging.getLogger(__name__)
 
+# 统计摘要的缓存有效期（秒），期间的重复刷新请求直接跳过
+STATS_CACHE_TTL = 0.5
+
+# 侧边栏按钮定义：(文本, 回调名, 样式, 提示)
+_EXPORT_BUTTONS = (
+    ("📊 导出Excel", "export_excel", SUCCESS, "导出完整Excel数据表"),
+    ("📄 导出PDF", "export_pdf", PRIMARY, "生成PDF分析报告"),
+    ("🌐 导出HTML", "export_html", INFO, "生成网页版报告"),
+    ("💾 导出JSON", "export_json", SECONDARY, "导出原始JSON数据"),
+)
+
+_NAV_BUTTONS = (
+    ("📊 数据概览", "switch_to_overview", SECONDARY, "查看系统数据概览"),
+    ("📈 数据分析", "switch_to_analysis", SECONDARY, "进行伤害计算分析"),
+    ("📊 图表对比", "switch_to_comparison", SECONDARY, "多干员图表对比"),
+    ("👥 干员管理", "switch_to_import", SECONDARY, "管理干员数据"),
+)
+
+_QUICK_BUTTONS = (
+    ("📥 导入数据", "quick_import", WARNING, "快速导入干员数据"),
+    ("🧹 清理缓存", "clear_cache", DANGER, "清理系统缓存数据"),
+)
+
 class SidebarPanel:
     """增强的侧边栏面板 - 基本导航、数据统计和导出功能"""
     
@@ -35,14 +60,34 @@ class SidebarPanel:
             'today_calculations': 0
         }
         
+        # 上次显示在标签上的统计值，以及上次查询数据库的时间（time.monotonic）
+        self._last_stats = {}
+        self._stats_cache_ts = 0.0
+        # 缓存有效期内收到刷新请求时安排的补充刷新（after id），保证最终显示最新数据
+        self._trailing_refresh_id = None
+        
         # 组件初始化标志
         self.ui_initialized = False
         
+        # 统计标签引用，在create_overview_section中创建
+        self.operator_count_label = None
+        self.import_count_label = None
+        self.calculation_count_label = None
+        self.today_calc_label = None
+        
+        # 所有按钮共用的工具提示窗口，悬停时只更新文本和位置
+        self._tip = tk.Toplevel(self.parent)
+        self._tip.wm_overrideredirect(True)
+        self._tip.withdraw()
+        self._tip_label = ttk.Label(self._tip, background="lightyellow",
+                                    relief="solid", borderwidth=1, font=("微软雅黑", 8))
+        self._tip_label.pack(padx=5, pady=2)
+        
         # 先创建UI
         self.setup_ui()
         
-        # UI创建完成后，延迟执行数据刷新
-        self.parent.after(100, self._delayed_refresh_data)
+        # UI创建完成后，待事件循环空闲时执行数据刷新
+        self.parent.after_idle(self.refresh_data)
     
     def setup_ui(self):
         """设置侧边栏UI - 集成隐形滚动功能"""
@@ -77,17 +122,6 @@ class SidebarPanel:
         # 标记UI初始化完成
         self.ui_initialized = True
     
-    def _delayed_refresh_data(self):
-        """延迟刷新数据，确保UI完全初始化"""
-        try:
-            if self.ui_initialized:
-                self.refresh_data()
-            else:
-                # 如果UI还没初始化，再延迟一点
-                self.parent.after(50, self._delayed_refresh_data)
-        except Exception as e:
-            logger.error(f"延迟刷新数据失败: {e}")
-    
     def create_overview_section(self, parent=None):
         """创建增强的概览区域"""
         if parent is None:
@@ -120,8 +154,9 @@ class SidebarPanel:
         ttk.Separator(overview_frame, orient=HORIZONTAL).pack(fill=X, pady=(8, 8))
         
         # 刷新按钮
-        ttk.Button(overview_frame, text="🔄 刷新数据", bootstyle=INFO, width=15,
-                  command=self.refresh_data_with_feedback).pack(pady=5)
+        self.refresh_btn = ttk.Button(overview_frame, text="🔄 刷新数据", bootstyle=INFO, width=15,
+                                      command=self.refresh_data_with_feedback)
+        self.refresh_btn.pack(pady=5)
     
     def create_export_section(self, parent=None):
         """创建导出功能区域"""
@@ -132,18 +167,7 @@ class SidebarPanel:
         export_frame.pack(fill=X, pady=(0, 10))
         
         # 导出按钮组
-        export_buttons = [
-            ("📊 导出Excel", "export_excel", SUCCESS, "导出完整Excel数据表"),
-            ("📄 导出PDF", "export_pdf", PRIMARY, "生成PDF分析报告"),
-            ("🌐 导出HTML", "export_html", INFO, "生成网页版报告"),
-            ("💾 导出JSON", "export_json", SECONDARY, "导出原始JSON数据")
-        ]
-        
-        for text, callback_name, style, tooltip in export_buttons:
-            btn = ttk.Button(export_frame, text=text, bootstyle=style, width=15,
-                           command=self._callback(callback_name))
-            btn.pack(fill=X, pady=2)
-            self.create_tooltip(btn, tooltip)
+        self._make_button_group(export_frame, _EXPORT_BUTTONS)
     
     def create_basic_navigation_section(self, parent=None):
         """创建基本导航区域"""
@@ -154,18 +178,7 @@ class SidebarPanel:
         nav_frame.pack(fill=X, pady=(0, 10))
         
         # 导航按钮
-        nav_buttons = [
-            ("📊 数据概览", "switch_to_overview", "查看系统数据概览"),
-            ("📈 数据分析", "switch_to_analysis", "进行伤害计算分析"),
-            ("📊 图表对比", "switch_to_comparison", "多干员图表对比"),
-            ("👥 干员管理", "switch_to_import", "管理干员数据")
-        ]
-        
-        for text, callback_name, tooltip in nav_buttons:
-            btn = ttk.Button(nav_frame, text=text, bootstyle=SECONDARY, width=15,
-                           command=self._callback(callback_name))
-            btn.pack(fill=X, pady=2)
-            self.create_tooltip(btn, tooltip)
+        self._make_button_group(nav_frame, _NAV_BUTTONS)
     
     def create_quick_actions_section(self, parent=None):
         """创建快捷操作区域"""
@@ -176,13 +189,12 @@ class SidebarPanel:
         actions_frame.pack(fill=X, pady=(0, 10))
         
         # 快捷操作按钮
-        quick_buttons = [
-            ("📥 导入数据", "quick_import", WARNING, "快速导入干员数据"),
-            ("🧹 清理缓存", "clear_cache", DANGER, "清理系统缓存数据")
-        ]
-        
-        for text, callback_name, style, tooltip in quick_buttons:
-            btn = ttk.Button(actions_frame, text=text, bootstyle=style, width=15,
+        self._make_button_group(actions_frame, _QUICK_BUTTONS)
+    
+    def _make_button_group(self, frame, button_defs):
+        """按定义依次创建按钮并绑定工具提示"""
+        for text, callback_name, style, tooltip in button_defs:
+            btn = ttk.Button(frame, text=text, bootstyle=style, width=15,
                            command=self._callback(callback_name))
             btn.pack(fill=X, pady=2)
             self.create_tooltip(btn, tooltip)
@@ -190,18 +202,12 @@ class SidebarPanel:
     def create_tooltip(self, widget, text):
         """创建工具提示"""
         def on_enter(event):
-            tooltip = tk.Toplevel()
-            tooltip.wm_overrideredirect(True)
-            tooltip.wm_geometry(f"+{event.x_root+10}+{event.y_root+10}")
-            label = ttk.Label(tooltip, text=text, background="lightyellow", 
-                            relief="solid", borderwidth=1, font=("微软雅黑", 8))
-            label.pack(padx=5, pady=2)
-            widget.tooltip = tooltip
+            self._tip_label.configure(text=text)
+            self._tip.wm_geometry(f"+{event.x_root+10}+{event.y_root+10}")
+            self._tip.deiconify()
         
         def on_leave(event):
-            if hasattr(widget, 'tooltip'):
-                widget.tooltip.destroy()
-                del widget.tooltip
+            self._tip.withdraw()
         
         widget.bind("<Enter>", on_enter)
         widget.bind("<Leave>", on_leave)
@@ -211,26 +217,7 @@ class SidebarPanel:
         try:
             # 显示刷新进度
             original_text = "🔄 刷新数据"
-            refresh_btn = None
-            
-            # 安全查找刷新按钮
-            for child in self.main_frame.winfo_children():
-                if hasattr(child, 'winfo_children'):
-                    for btn in child.winfo_children():
-                        # 安全检查组件是否支持text选项
-                        if hasattr(btn, 'cget') and hasattr(btn, 'winfo_class'):
-                            try:
-                                # 检查组件类型，确保是Button类型
-                                widget_class = btn.winfo_class()
-                                if widget_class in ['Button', 'TButton']:
-                                    btn_text = btn.cget('text')
-                                    if "刷新" in str(btn_text):
-                                        refresh_btn = btn
-                                        break
-                            except Exception as e:
-                                # 如果获取text失败，跳过这个组件
-                                logger.debug(f"查找刷新按钮时跳过组件: {e}")
-                                continue
+            refresh_btn = self.refresh_btn
             
             if refresh_btn:
                 refresh_btn.configure(text="⏳ 刷新中...", state="disabled")
@@ -255,22 +242,44 @@ class SidebarPanel:
                 self.main_frame.after(3000, lambda: refresh_btn.configure(text=original_text))
             messagebox.showerror("刷新失败", f"刷新数据时出现错误：\n{str(e)}")
     
+    def _trailing_refresh(self):
+        """缓存有效期结束后执行的补充刷新"""
+        self._trailing_refresh_id = None
+        self.refresh_data()
+    
     def refresh_data(self):
         """刷新数据统计"""
         try:
             logger.info("开始刷新sidebar数据...")
             
             # 检查UI是否已经初始化
-            if not getattr(self, 'ui_initialized', False):
+            if not self.ui_initialized:
                 logger.debug("UI未初始化，跳过数据刷新")
                 return
             
             logger.info("UI已初始化，继续刷新...")
             
             if self.db_manager:
+                # 短时间内的多次刷新请求合并为一次查询，标签已显示最新结果
+                now = time.monotonic()
+                elapsed = now - self._stats_cache_ts
+                if elapsed < STATS_CACHE_TTL:
+                    # 有效期结束后再补充刷新一次，多次请求只安排一次
+                    if self._trailing_refresh_id is None:
+                        remaining_ms = int((STATS_CACHE_TTL - elapsed) * 1000) + 1
+                        self._trailing_refresh_id = self.parent.after(remaining_ms, self._trailing_refresh)
+                    logger.debug("统计摘要仍在缓存有效期内，推迟到有效期结束后刷新")
+                    return
+                
+                # 本次查询已包含最新数据，取消尚未执行的补充刷新
+                if self._trailing_refresh_id is not None:
+                    self.parent.after_cancel(self._trailing_refresh_id)
+                    self._trailing_refresh_id = None
+                
                 logger.info("开始获取统计摘要...")
                 # 获取统计摘要
                 stats = self.db_manager.get_statistics_summary()
+                self._stats_cache_ts = now
                 logger.info(f"获取统计摘要成功: {stats}")
                 
                 # 更新内部数据
@@ -280,52 +289,64 @@ class SidebarPanel:
                     'calculation_count': stats.get('total_calculations', 0),
                     'today_calculations': stats.get('today_calculations', 0)
                 })
-                logger.info("内部数据更新完成")
-                
-                # 简化的UI更新逻辑 - 直接更新标签
-                logger.info("开始更新UI标签...")
                 
                 try:
-                    # 直接更新标签，移除复杂的安全检查
-                    if hasattr(self, 'operator_count_label') and self.operator_count_label:
+                    # 只更新数值发生变化的标签，全部更新后统一刷新一次界面
+                    last_stats = self._last_stats
+                    updated = []
+                    
+                    if self.stats_data['operator_count'] != last_stats.get('operator_count'):
                         self.operator_count_label.configure(text=f"👥 干员数量: {self.stats_data['operator_count']}")
-                        logger.info("干员数量标签更新成功")
+                        updated.append('operator_count')
                     
-                    if hasattr(self, 'import_count_label') and self.import_count_label:
+                    if self.stats_data['import_count'] != last_stats.get('import_count'):
                         self.import_count_label.configure(text=f"📁 导入记录: {self.stats_data['import_count']}")
-                        logger.info("导入记录标签更新成功")
+                        updated.append('import_count')
                     
-                    if hasattr(self, 'calculation_count_label') and self.calculation_count_label:
+                    if self.stats_data['calculation_count'] != last_stats.get('calculation_count'):
                         self.calculation_count_label.configure(text=f"📈 计算记录: {self.stats_data['calculation_count']}")
-                        logger.info("计算记录标签更新成功")
+                        updated.append('calculation_count')
                     
-                    if hasattr(self, 'today_calc_label') and self.today_calc_label:
+                    if self.stats_data['today_calculations'] != last_stats.get('today_calculations'):
                         self.today_calc_label.configure(text=f"🔢 今日计算: {self.stats_data['today_calculations']}")
-                        logger.info("今日计算标签更新成功")
+                        updated.append('today_calculations')
+                    
+                    if updated:
+                        self.main_frame.update_idletasks()
+                    
+                    self._last_stats = dict(self.stats_data)
+                    logger.info("侧边栏标签已更新: %s", updated)
                         
                 except Exception as e:
                     logger.error(f"更新UI标签失败: {e}")
+                    self._last_stats = {}
                 
                 logger.info(f"侧边栏数据刷新完成: {self.stats_data}")
                 
-        except Exception as e:
+        except sqlite3.Error as e:
             logger.error(f"刷新侧边栏数据失败: {e}")
-            import traceback
-            logger.error(f"错误堆栈: {traceback.format_exc()}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("刷新侧边栏数据错误堆栈", exc_info=True)
             
-            # 安全显示错误状态
-            if getattr(self, 'ui_initialized', False):
-                try:
-                    if hasattr(self, 'operator_count_label') and self.operator_count_label:
-                        self.operator_count_label.configure(text="👥 干员数量: 错误")
-                    if hasattr(self, 'import_count_label') and self.import_count_label:
-                        self.import_count_label.configure(text="📁 导入记录: 错误")
-                    if hasattr(self, 'calculation_count_label') and self.calculation_count_label:
-                        self.calculation_count_label.configure(text="📈 计算记录: 错误")
-                    if hasattr(self, 'today_calc_label') and self.today_calc_label:
-                        self.today_calc_label.configure(text="🔢 今日计算: 错误")
-                except:
-                    pass
+            # 标签将显示错误状态，下次刷新需要重新查询并更新全部标签
+            self._last_stats = {}
+            self._stats_cache_ts = 0.0
+            
+            # 显示错误状态
+            if self.ui_initialized:
+                self._safe_set(self.operator_count_label, "👥 干员数量: 错误")
+                self._safe_set(self.import_count_label, "📁 导入记录: 错误")
+                self._safe_set(self.calculation_count_label, "📈 计算记录: 错误")
+                self._safe_set(self.today_calc_label, "🔢 今日计算: 错误")
+    
+    def _safe_set(self, label, text: str):
+        """设置标签文本，标签不存在或已销毁时忽略"""
+        if label is None:
+            return
+        try:
+            label.configure(text=text)
+        except tk.TclError:
+            pass
     
     def refresh_stats(self):
         """刷新统计数据的别名方法，兼容旧版本调用"""
@@ -1,47 +1,62 @@
 # theme_manager.py - 简化的主题管理器
 
 import ttkbootstrap as ttk
-from typing import List, Dict, Callable, Optional
+import logging
+from types import MappingProxyType
+from typing import Dict, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 支持的主题列表
+_AVAILABLE_THEMES = (
+    'cosmo', 'flatly', 'litera', 'minty', 'lux', 'sandstone', 'yeti', 
+    'pulse', 'united', 'morph', 'journal', 'darkly', 'superhero', 
+    'solar', 'cyborg', 'vapor'
+)
+
+# 主题显示名称映射（只读）
+_DISPLAY_NAMES = MappingProxyType({
+    'cosmo': 'Cosmo (默认浅色)',
+    'flatly': 'Flatly (扁平浅色)',
+    'litera': 'Litera (文学风格)',
+    'minty': 'Minty (薄荷绿)',
+    'lux': 'Lux (豪华风格)',
+    'sandstone': 'Sandstone (沙石风格)',
+    'yeti': 'Yeti (雪白主题)',
+    'pulse': 'Pulse (脉冲紫)',
+    'united': 'United (联合橙)',
+    'morph': 'Morph (变形风格)',
+    'journal': 'Journal (期刊风格)',
+    'darkly': 'Darkly (深色主题)',
+    'superhero': 'Superhero (超级英雄)',
+    'solar': 'Solar (太阳能黄)',
+    'cyborg': 'Cyborg (机械风格)',
+    'vapor': 'Vapor (蒸汽波)'
+})
 
 class ThemeManager:
     """简化的主题管理器"""
     
     def __init__(self):
         """初始化主题管理器"""
-        # 支持的主题列表
-        self.available_themes = [
-            'cosmo', 'flatly', 'litera', 'minty', 'lux', 'sandstone', 'yeti', 
-            'pulse', 'united', 'morph', 'journal', 'darkly', 'superhero', 
-            'solar', 'cyborg', 'vapor'
-        ]
+        # 支持的主题及显示名称（模块级常量，各实例共享）
+        self.available_themes = _AVAILABLE_THEMES
+        self.theme_display_names = _DISPLAY_NAMES
         
-        # 主题显示名称映射
-        self.theme_display_names = {
-            'cosmo': 'Cosmo (默认浅色)',
-            'flatly': 'Flatly (扁平浅色)',
-            'litera': 'Litera (文学风格)',
-            'minty': 'Minty (薄荷绿)',
-            'lux': 'Lux (豪华风格)',
-            'sandstone': 'Sandstone (沙石风格)',
-            'yeti': 'Yeti (雪白主题)',
-            'pulse': 'Pulse (脉冲紫)',
-            'united': 'United (联合橙)',
-            'morph': 'Morph (变形风格)',
-            'journal': 'Journal (期刊风格)',
-            'darkly': 'Darkly (深色主题)',
-            'superhero': 'Superhero (超级英雄)',
-            'solar': 'Solar (太阳能黄)',
-            'cyborg': 'Cyborg (机械风格)',
-            'vapor': 'Vapor (蒸汽波)'
-        }
+        # 显示名称缓存（含未登记主题的title()回退值）及按需构建的反向映射
+        self._display_cache: Dict[str, str] = dict(self.theme_display_names)
+        self._reverse_display: Optional[Dict[str, str]] = None
         
         # 当前主题
         self.current_theme = 'cosmo'
         
+        # 实际已通过theme_use应用的主题，用于跳过重复的全局重绘
+        self._applied_theme: Optional[str] = None
+        
         # 主题变更回调
         self.theme_change_callback: Optional[Callable] = None
     
-    def get_available_themes(self) -> List[str]:
+    def get_available_themes(self) -> Tuple[str, ...]:
         """获取可用主题列表"""
         return self.available_themes
     
@@ -51,7 +66,13 @@ class ThemeManager:
     
     def get_theme_display_name(self, theme_name: str) -> str:
         """获取主题显示名称"""
-        return self.theme_display_names.get(theme_name, theme_name.title())
+        return self._display_cache.get(theme_name) or self._display_cache.setdefault(theme_name, theme_name.title())
+    
+    def get_theme_by_display_name(self, display_name: str) -> Optional[str]:
+        """根据显示名称获取主题名，未找到时返回None"""
+        if self._reverse_display is None:
+            self._reverse_display = {v: k for k, v in self.theme_display_names.items()}
+        return self._reverse_display.get(display_name)
     
     def set_theme_change_callback(self, callback_func: Callable):
         """设置主题变更回调函数"""
@@ -60,31 +81,36 @@ class ThemeManager:
     def apply_theme(self, theme_name: str) -> bool:
         """应用主题"""
         if theme_name in self.available_themes:
+            # 主题未变化时不再触发回调，避免重复重绘所有组件
+            if theme_name == self._applied_theme:
+                self.current_theme = theme_name
+                return True
+            
             self.current_theme = theme_name
             # 触发回调
             if self.theme_change_callback:
                 try:
                     self.theme_change_callback(theme_name)
                 except Exception as e:
-                    print(f"主题回调执行失败: {e}")
+                    logger.error("主题回调执行失败: %s", e)
             return True
         return False
     
     def apply_theme_to_window(self, window, theme_name: str) -> bool:
         """应用主题到指定窗口"""
         if theme_name in self.available_themes:
+            if theme_name == self._applied_theme:
+                self.current_theme = theme_name
+                return True
+            
             try:
-                # 如果窗口有style属性，更新主题
-                if hasattr(window, 'style'):
-                    window.style.theme_use(theme_name)
-                # 对于ttk.Window类型，直接设置主题
-                elif hasattr(window, 'style') or isinstance(window, ttk.Window):
-                    style = ttk.Style()
-                    style.theme_use(theme_name)
+                # ttkbootstrap的Style为全局单例，theme_use会作用于所有窗口
+                ttk.Style().theme_use(theme_name)
                 
+                self._applied_theme = theme_name
                 self.current_theme = theme_name
                 return True
             except Exception as e:
-                print(f"应用主题到窗口失败: {e}")
+                logger.error("应用主题到窗口失败: %s", e)
                 return False
         return False 
\ No newline at end of file
@@ -9,13 +9,38 @@ from typing import Optional, Callable
 class EventManager:
     """简化的事件管理器"""
     
+    # 默认滚轮处理使用的自定义绑定标签，只加到注册过的控件上
+    MOUSEWHEEL_TAG = "DefaultMouseWheel"
+    
     def __init__(self):
         pass
     
+    @staticmethod
+    def _default_mousewheel_handler(event):
+        """默认滚轮处理：滚动触发事件的控件（X11下滚轮为Button-4/5事件）"""
+        scroll = getattr(event.widget, 'yview_scroll', None)
+        if scroll is None:
+            return
+        if event.num == 4:
+            step = -1
+        elif event.num == 5:
+            step = 1
+        else:
+            # 向零取整保证上下滚动对称，触控板的小增量（|delta|<120）至少滚动一格
+            step = -int(event.delta / 120)
+            if step == 0 and event.delta:
+                step = -1 if event.delta > 0 else 1
+        scroll(step, "units")
+        # 阻止控件类自带的滚轮绑定再滚动一次
+        return "break"
+    
     def bind_mousewheel(self, widget: tk.Widget, callback: Optional[Callable] = None) -> bool:
         """
         绑定鼠标滚轮事件
         
+        未提供回调时，给控件加上自定义绑定标签MOUSEWHEEL_TAG，
+        所有注册控件共享标签上的同一个处理函数；提供回调时仍按控件单独绑定。
+        
         Args:
             widget: 要绑定的控件
             callback: 自定义回调函数
@@ -23,16 +48,19 @@ class EventManager:
         Returns:
             是否成功绑定
         """
-        def default_handler(event):
-            try:
-                widget.yview_scroll(int(-1*(event.delta/120)), "units")
-            except (tk.TclError, AttributeError):
-                pass
-        
-        handler = callback if callback else default_handler
-        
         try:
-            widget.bind("<MouseWheel>", handler)
+            if callback:
+                widget.bind("<MouseWheel>", callback)
+                return True
+            
+            tag = self.MOUSEWHEEL_TAG
+            tags = widget.bindtags()
+            if tag not in tags:
+                # 标签上的绑定属于各自的Tk解释器，每个解释器只绑定一次
+                if not widget.bind_class(tag, "<MouseWheel>"):
+                    for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                        widget.bind_class(tag, sequence, self._default_mousewheel_handler)
+                widget.bindtags((tag,) + tags)
             return True
         except Exception:
             return False
@@ -41,12 +69,9 @@ class EventManager:
         """清理资源"""
         pass
 
-# 全局事件管理器实例
-_event_manager = None
+# 全局事件管理器实例（初始化无开销，导入时直接创建）
+_event_manager = EventManager()
 
 def get_event_manager() -> EventManager:
     """获取事件管理器实例"""
-    global _event_manager
-    if _event_manager is None:
-        _event_manager = EventManager()
-    return _event_manager 
\ No newline at end of file
+    return _event_manager
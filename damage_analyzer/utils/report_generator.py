@@ -1,26 +1,296 @@
 # report_generator.py - 报告生成器
 
 import os
+import sys
+import html
 import logging
-from typing import Dict, List, Any, Optional
+import threading
+import time
+from functools import cache
+from itertools import islice
+from types import SimpleNamespace
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple, Union
 from tkinter import messagebox, filedialog
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# PIL用于读取图表图片尺寸，未安装时PDF中的图表使用默认尺寸
+try:
+    from PIL import Image as PILImage
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# 报告数据缓存有效期（秒），连续导出多种格式时复用同一份数据
+REPORT_DATA_CACHE_TTL = 10.0
+
+# PDF表格单个分块的最大数据行数
+PDF_TABLE_CHUNK_ROWS = 50
+
+# 报告文件写入缓冲区大小（字节）
+REPORT_WRITE_BUFFER_SIZE = 1 << 20
+
+# 导出报告时保存图表图片的参数
+CHART_SAVEFIG_OPTIONS = {'dpi': 300, 'bbox_inches': 'tight', 'facecolor': 'white'}
+
+def _f(value, digits: int = 2) -> str:
+    """将数值格式化为固定小数位的字符串，空值按0处理"""
+    return f"{float(value or 0):.{digits}f}"
+
+def _f1(value) -> str:
+    """保留1位小数的_f"""
+    return _f(value, 1)
+
+# 多干员对比详细表格的列定义：(字段名, 缺失时的默认值, 格式化函数)
+_DETAIL_COLS = (
+    ('干员名称', '', str),
+    ('职业类型', '', str),
+    ('攻击类型', '', str),
+    ('攻击力', 0, str),
+    ('攻击速度', 0, _f1),
+    ('生命值', 0, str),
+    ('部署费用', 0, str),
+    ('DPS', 0, _f),
+    ('DPH', 0, _f),
+    ('破甲线', 0, str),
+    ('性价比', 0, _f)
+)
+
+# 详细表格行的HTML片段
+_DETAIL_ROW_OPEN = '\n' + ' ' * 40 + '<tr style="background-color: #f8f9fa;">\n' + ' ' * 44 + '<td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">'
+_DETAIL_CELL_SEP = '</td>\n' + ' ' * 44 + '<td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">'
+_DETAIL_ROW_CLOSE = '</td>\n' + ' ' * 40 + '</tr>\n' + ' ' * 36
+
+# HTML报告职业分布表的行模板：(职业, 数量, 占比)
+_CLASS_ROW_HTML = """
+                <tr>
+                    <td>{}</td>
+                    <td>{}</td>
+                    <td>{:.1f}%</td>
+                </tr>
+"""
+
+# HTML报告中不随数据变化的文档头（DOCTYPE与样式表），模块加载时构造一次
+_HTML_REPORT_HEAD = """
+<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>塔防游戏伤害分析器 - 完整分析报告</title>
+    <style>
+        body {
+            font-family: 'Microsoft YaHei', Arial, sans-serif;
+            line-height: 1.6;
+            margin: 0;
+            padding: 20px;
+            background-color: #f5f5f5;
+        }
+        .container {
+            max-width: 1200px;
+            margin: 0 auto;
+            background-color: white;
+            padding: 30px;
+            border-radius: 10px;
+            box-shadow: 0 0 20px rgba(0,0,0,0.1);
+        }
+        h1 {
+            color: #2c3e50;
+            text-align: center;
+            border-bottom: 3px solid #3498db;
+            padding-bottom: 10px;
+        }
+        h2 {
+            color: #34495e;
+            border-left: 4px solid #3498db;
+            padding-left: 15px;
+            margin-top: 30px;
+        }
+        .meta-info {
+            background-color: #ecf0f1;
+            padding: 15px;
+            border-radius: 5px;
+            margin-bottom: 20px;
+        }
+        table {
+            width: 100%;
+            border-collapse: collapse;
+            margin: 20px 0;
+            background-color: white;
+        }
+        th, td {
+            border: 1px solid #ddd;
+            padding: 12px;
+            text-align: left;
+        }
+        th {
+            background-color: #3498db;
+            color: white;
+            font-weight: bold;
+        }
+        tr:nth-child(even) {
+            background-color: #f9f9f9;
+        }
+        tr:hover {
+            background-color: #f5f5f5;
+        }
+        .stats-grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
+            gap: 20px;
+            margin: 20px 0;
+        }
+        .stat-card {
+            background-color: #3498db;
+            color: white;
+            padding: 20px;
+            border-radius: 8px;
+            text-align: center;
+        }
+        .stat-number {
+            font-size: 2em;
+            font-weight: bold;
+            margin-bottom: 5px;
+        }
+        .stat-label {
+            font-size: 0.9em;
+            opacity: 0.9;
+        }
+        .footer {
+            text-align: center;
+            margin-top: 40px;
+            padding-top: 20px;
+            border-top: 1px solid #ddd;
+            color: #7f8c8d;
+        }
+    </style>
+</head>
+"""
+
+@cache
+def _load_reportlab() -> SimpleNamespace:
+    """
+    导入PDF报告用到的reportlab组件，成功后缓存结果
+    
+    Raises:
+        ImportError: 未安装reportlab（失败不会被缓存，安装后可直接重试）
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, PageBreak
+    
+    return SimpleNamespace(
+        colors=colors, A4=A4, inch=inch,
+        getSampleStyleSheet=getSampleStyleSheet, ParagraphStyle=ParagraphStyle,
+        SimpleDocTemplate=SimpleDocTemplate, Paragraph=Paragraph, Spacer=Spacer,
+        Table=Table, TableStyle=TableStyle, Image=Image, PageBreak=PageBreak
+    )
+
+def _unpack_stats(stats: Dict[str, Any]) -> tuple:
+    """一次取出报告用到的统计项：(干员总数, 导入记录数, 计算记录数, 今日计算数, 职业分布)"""
+    get = stats.get
+    return (get('total_operators', 0), get('total_imports', 0), get('total_calculations', 0),
+            get('today_calculations', 0), get('class_distribution', {}))
+
+def _fit_image_size(path: str, max_width: float, max_height: float) -> tuple:
+    """按最大宽高等比缩放图片，返回(显示宽度, 显示高度)；无法读取尺寸时返回最大宽高"""
+    if not PIL_AVAILABLE:
+        return max_width, max_height
+    try:
+        with PILImage.open(path) as pil_img:
+            img_width, img_height = pil_img.size
+    except Exception as e:
+        logger.warning(f"读取图片尺寸失败: {e}")
+        return max_width, max_height
+    scale = min(max_width / img_width, max_height / img_height)
+    return img_width * scale, img_height * scale
+
+def _esc_cells(values) -> List[str]:
+    """批量对单元格文本做HTML转义，干员名等用户数据中可能含有<、&等字符"""
+    return list(map(html.escape, map(str, values)))
+
+def _render_detail_rows(rows: List[Dict[str, Any]]) -> str:
+    """渲染多干员对比详细表格的全部HTML行"""
+    cols = _DETAIL_COLS
+    width = len(cols)
+    # 先格式化全部单元格，再整表一次性转义
+    cells = _esc_cells([fmt(row.get(key, default)) for row in rows for key, default, fmt in cols])
+    parts = []
+    for start in range(0, len(cells), width):
+        parts.append(_DETAIL_ROW_OPEN + _DETAIL_CELL_SEP.join(cells[start:start + width]) + _DETAIL_ROW_CLOSE)
+    return "".join(parts)
+
 class ReportGenerator:
     """统一的报告生成器"""
     
-    def __init__(self, db_manager):
+    # 已解析的PDF中文字体名，所有实例共享，None表示尚未解析
+    _CHINESE_FONT = None
+    
+    # 各平台依次尝试注册的系统中文字体，只探测当前平台的路径
+    _CHINESE_FONT_PATHS = {
+        'win32': (
+            "C:/Windows/Fonts/msyh.ttc",      # 微软雅黑
+            "C:/Windows/Fonts/simsun.ttc",    # 宋体
+            "C:/Windows/Fonts/simhei.ttf"     # 黑体
+        ),
+        'darwin': ("/System/Library/Fonts/PingFang.ttc",),
+        'linux': ("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",)
+    }
+    
+    def __init__(self, db_manager, root=None):
         """
         初始化报告生成器
         
         Args:
             db_manager: 数据库管理器实例
+            root: Tk根窗口，提供时报告在后台线程生成，提示框通过root.after回到主线程显示
         """
         self.db_manager = db_manager
+        self.root = root
+        
+        # 报告生成线程池（单线程，多次导出按顺序执行）
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="report") if root is not None else None
+        
+        # 报告数据缓存、收集时间（time.monotonic）及收集时的数据库版本
+        self._data_cache = None
+        self._cache_ts = 0.0
+        self._cache_version = None
+        
+        # 按线程记录的提示框收集列表，不为None时该线程内的提示框不弹出，错误信息改为收集
+        self._dialogs = threading.local()
+    
+    def invalidate_cache(self):
+        """清除报告数据缓存，数据变更后调用"""
+        self._data_cache = None
+        self._cache_ts = 0.0
+        self._cache_version = None
+    
+    def _ui_call(self, func, *args):
+        """在Tk主线程中执行func，后台线程中通过root.after(0)转交"""
+        if self.root is not None and threading.current_thread() is not threading.main_thread():
+            self.root.after(0, lambda: func(*args))
+        else:
+            func(*args)
+    
+    def _show_info(self, title: str, message: str):
+        """显示提示信息（线程安全）"""
+        if getattr(self._dialogs, 'collected', None) is not None:
+            return
+        self._ui_call(messagebox.showinfo, title, message)
     
-    def generate_complete_analysis_report(self, format_type: str, filename: str = None, data: Dict[str, Any] = None) -> bool:
+    def _show_error(self, title: str, message: str):
+        """显示错误信息（线程安全）"""
+        collected = getattr(self._dialogs, 'collected', None)
+        if collected is not None:
+            collected.append(message)
+            return
+        self._ui_call(messagebox.showerror, title, message)
+    
+    def generate_complete_analysis_report(self, format_type: str, filename: str = None, data: Dict[str, Any] = None) -> Union[bool, Future]:
         """
         生成完整分析报告
         
@@ -30,7 +300,8 @@ class ReportGenerator:
             data: 报告数据
             
         Returns:
-            是否生成成功
+            提供了root时返回后台生成任务的Future（结果为是否生成成功），
+            否则直接返回是否生成成功；未选择文件或格式不支持时返回False
         """
         try:
             if filename is None:
@@ -56,29 +327,148 @@ class ReportGenerator:
             if not filename:
                 return False
             
+            if format_type not in ('pdf', 'html', 'txt'):
+                messagebox.showerror("错误", f"不支持的报告格式: {format_type}")
+                return False
+            
+            # 数据收集和文件生成放到后台线程，避免阻塞界面
+            if self._executor is not None:
+                return self._executor.submit(self._build_report, format_type, filename, data)
+            return self._build_report(format_type, filename, data)
+                
+        except Exception as e:
+            logger.error(f"生成{format_type}报告失败: {e}")
+            messagebox.showerror("生成失败", f"生成{format_type}报告失败：\n{str(e)}")
+            return False
+    
+    def generate_all_formats(self, base_filename: str, data: Dict[str, Any] = None) -> Union[Dict[str, bool], Future]:
+        """
+        同时导出PDF、HTML、TXT三种格式的完整分析报告
+        
+        Args:
+            base_filename: 输出文件路径（扩展名会被替换为各格式的扩展名）
+            data: 报告数据，未提供时收集一次供三种格式共用
+        
+        Returns:
+            提供了root时返回后台任务的Future，结果与无root时相同：
+            {格式: 是否生成成功}；全部完成后只显示一个汇总提示框
+        """
+        base = os.path.splitext(base_filename)[0]
+        if self._executor is not None:
+            return self._executor.submit(self._build_all_formats, base, data)
+        return self._build_all_formats(base, data)
+    
+    def _build_all_formats(self, base: str, data: Optional[Dict[str, Any]]) -> Dict[str, bool]:
+        """收集一次数据后并行生成三种格式的报告"""
+        if data is None:
+            data = self._collect_report_data()
+        
+        formats = ('pdf', 'html', 'txt')
+        with ThreadPoolExecutor(max_workers=len(formats), thread_name_prefix="report-all") as executor:
+            futures = {fmt: executor.submit(self._build_report_quietly, fmt, f"{base}.{fmt}", data) for fmt in formats}
+            outcomes = {fmt: future.result() for fmt, future in futures.items()}
+        
+        # 汇总三种格式的结果，只在界面线程显示一个提示框
+        lines = []
+        for fmt, (success, errors) in outcomes.items():
+            if success:
+                lines.append(f"{fmt.upper()}: {base}.{fmt}")
+            else:
+                lines.append(f"{fmt.upper()}: 导出失败 {' '.join(errors)}".rstrip())
+        results = {fmt: success for fmt, (success, _) in outcomes.items()}
+        if all(results.values()):
+            self._show_info("导出成功", "报告已导出到:\n" + "\n".join(lines))
+        else:
+            self._show_error("导出失败", "部分报告导出失败:\n" + "\n".join(lines))
+        return results
+    
+    def _build_report_quietly(self, format_type: str, filename: str, data: Dict[str, Any]) -> Tuple[bool, List[str]]:
+        """生成报告但不弹出提示框，返回(是否成功, 收集到的错误信息)"""
+        errors = []
+        self._dialogs.collected = errors
+        try:
+            return self._build_report(format_type, filename, data), errors
+        finally:
+            self._dialogs.collected = None
+    
+    def _build_report(self, format_type: str, filename: str, data: Optional[Dict[str, Any]]) -> bool:
+        """收集数据并生成指定格式的报告文件（可在后台线程中执行）"""
+        try:
             # 获取报告数据
             if data is None:
                 data = self._collect_report_data()
             
             current_time = datetime.now()
             
+            # 没有任何数据时直接生成简短的空报告
+            if self._is_empty_report_data(data):
+                return self._empty_report(format_type, filename, current_time)
+            
             if format_type == 'pdf':
                 return self.generate_pdf_report(filename, data['stats'], data['operators'], data['calc_records'], data['recent_calculations'], current_time)
             elif format_type == 'html':
                 return self.generate_html_report(filename, data['stats'], data['operators'], data['calc_records'], data['recent_calculations'], current_time)
-            elif format_type == 'txt':
-                return self.generate_text_report(filename, data['stats'], data['operators'], data['calc_records'], data['recent_calculations'], current_time)
             else:
-                messagebox.showerror("错误", f"不支持的报告格式: {format_type}")
-                return False
-                
+                return self.generate_text_report(filename, data['stats'], data['operators'], data['calc_records'], data['recent_calculations'], current_time)
+        
         except Exception as e:
             logger.error(f"生成{format_type}报告失败: {e}")
-            messagebox.showerror("生成失败", f"生成{format_type}报告失败：\n{str(e)}")
+            self._show_error("生成失败", f"生成{format_type}报告失败：\n{str(e)}")
             return False
     
+    @staticmethod
+    def _is_empty_report_data(data: Dict[str, Any]) -> bool:
+        """判断报告数据是否为空（无干员、无计算记录且统计计数全为0）"""
+        if data.get('operators') or data.get('calc_records') or data.get('recent_calculations'):
+            return False
+        stats = data.get('stats') or {}
+        return not any(stats.get(key) for key in ('total_operators', 'total_imports', 'total_calculations'))
+    
+    def _empty_report(self, format_type: str, filename: str, current_time: datetime) -> bool:
+        """生成无数据时的简短报告"""
+        title = "塔防游戏伤害分析器 - 完整分析报告"
+        message = "当前没有干员数据和计算记录。请先导入干员并进行一些计算分析。"
+        time_text = current_time.strftime('%Y年%m月%d日 %H:%M:%S')
+        
+        if format_type == 'pdf':
+            try:
+                rl = _load_reportlab()
+            except ImportError:
+                self._show_error("错误", "需要安装reportlab库才能生成PDF报告\n请运行: pip install reportlab")
+                return False
+            
+            chinese_font = self._get_chinese_font()
+            style = rl.ParagraphStyle('EmptyReport', parent=rl.getSampleStyleSheet()['Normal'],
+                                      fontName=chinese_font, fontSize=12, leading=20)
+            rl.SimpleDocTemplate(filename, pagesize=rl.A4).build([
+                rl.Paragraph(title, style),
+                rl.Paragraph(f"报告生成时间: {time_text}", style),
+                rl.Paragraph(message, style)
+            ])
+        elif format_type == 'html':
+            html_content = (f'<!DOCTYPE html>\n<html lang="zh-CN">\n<head><meta charset="UTF-8"><title>{title}</title></head>\n'
+                            f'<body>\n<h1>{title}</h1>\n<p>报告生成时间: {time_text}</p>\n<p>{message}</p>\n</body>\n</html>\n')
+            with open(filename, 'wb') as f:
+                f.write(html_content.encode('utf-8'))
+        else:
+            with open(filename, 'w', encoding='utf-8') as f:
+                f.write(f"{title}\n{'='*50}\n\n报告生成时间: {time_text}\n\n{message}\n")
+        
+        self._show_info("导出成功", f"{format_type.upper()}报告已导出到: {filename}（暂无数据）")
+        return True
+    
+    def _data_version(self) -> tuple:
+        """当前数据库的(干员数据版本, 记录版本)"""
+        return (self.db_manager.get_data_version(), self.db_manager.get_records_version())
+    
     def _collect_report_data(self) -> Dict[str, Any]:
-        """收集报告数据"""
+        """收集报告数据（短时间内且数据库未变化时返回缓存数据的浅拷贝）"""
+        # 干员或计算/导入记录被修改后版本号变化，缓存随之失效，不依赖调用方清除缓存
+        version = self._data_version()
+        if (self._data_cache is not None and version == self._cache_version
+                and time.monotonic() - self._cache_ts < REPORT_DATA_CACHE_TTL):
+            return dict(self._data_cache)
+        
         try:
             # 获取统计数据
             stats = self.db_manager.get_statistics_summary()
@@ -86,18 +476,21 @@ class ReportGenerator:
             # 获取干员数据
             operators = self.db_manager.get_all_operators()
             
-            # 获取前4次计算记录（最新的4次）
-            recent_calculations = self.db_manager.get_calculation_history(limit=4)
-            
-            # 获取计算记录（用于历史记录展示）
+            # 获取计算记录（用于历史记录展示，按时间倒序）
             calc_records = self.db_manager.get_calculation_history(limit=100)
             
-            return {
+            # 前4次计算记录（最新的4次）直接取自上面的结果
+            recent_calculations = calc_records[:4]
+            
+            self._data_cache = {
                 'stats': stats,
                 'operators': operators,
                 'calc_records': calc_records,
                 'recent_calculations': recent_calculations  # 新增：前4次计算结果
             }
+            self._cache_ts = time.monotonic()
+            self._cache_version = version
+            return dict(self._data_cache)
         except Exception as e:
             logger.error(f"收集报告数据失败: {e}")
             return {
@@ -107,51 +500,93 @@ class ReportGenerator:
                 'recent_calculations': []
             }
     
+    def _get_chinese_font(self) -> str:
+        """获取PDF使用的中文字体名，字体只在首次调用时查找并注册"""
+        if ReportGenerator._CHINESE_FONT is None:
+            ReportGenerator._CHINESE_FONT = self._resolve_chinese_font()
+        return ReportGenerator._CHINESE_FONT
+    
+    def _resolve_chinese_font(self) -> str:
+        """查找并注册系统中文字体，失败时返回默认字体Helvetica"""
+        try:
+            from reportlab.pdfbase import pdfmetrics
+            from reportlab.pdfbase.ttfonts import TTFont
+            
+            font_paths = self._CHINESE_FONT_PATHS.get(sys.platform)
+            if font_paths is None:
+                # 未知平台时探测全部路径
+                font_paths = [path for paths in self._CHINESE_FONT_PATHS.values() for path in paths]
+            
+            for font_path in font_paths:
+                if os.path.exists(font_path):
+                    try:
+                        # TTC字体集合使用第一个子字体
+                        if font_path.endswith('.ttc'):
+                            pdfmetrics.registerFont(TTFont('ChineseFont', font_path, subfontIndex=0))
+                        else:
+                            pdfmetrics.registerFont(TTFont('ChineseFont', font_path))
+                        
+                        logger.info(f"成功注册中文字体: {font_path}")
+                        return 'ChineseFont'
+                    except Exception as font_error:
+                        logger.debug(f"注册字体 {font_path} 失败: {font_error}")
+                        continue
+            
+            logger.warning("无法注册中文字体，将使用默认字体")
+        except Exception as e:
+            logger.warning(f"注册中文字体失败: {e}")
+        return 'Helvetica'
+    
+    def _add_chunked_table(self, story: List, table_data: List[List[str]], style, chunk_size: int = PDF_TABLE_CHUNK_ROWS):
+        """
+        将表格按行数分块加入story
+        
+        Args:
+            story: PDF内容列表
+            table_data: 表格数据，首行为表头，每个分块都会重复表头
+            style: 表格样式
+            chunk_size: 每个分块的最大数据行数
+        """
+        rl = _load_reportlab()
+        Table, Spacer = rl.Table, rl.Spacer
+        
+        header, rows = table_data[0], table_data[1:]
+        for start in range(0, max(len(rows), 1), chunk_size):
+            if start:
+                story.append(Spacer(1, 10))
+            story.append(Table([header] + rows[start:start + chunk_size], repeatRows=1, style=style))
+    
     def generate_pdf_report(self, filename: str, stats: Dict, operators: List, calc_records: List, recent_calculations: List, current_time: datetime) -> bool:
         """生成PDF报告"""
         try:
-            # 尝试导入reportlab
+            total_operators, total_imports, total_calcs, today_calcs, class_dist = _unpack_stats(stats)
+            
+            # 尝试导入reportlab（成功后缓存，重复导出不再走导入流程）
             try:
-                from reportlab.lib.pagesizes import letter, A4
-                from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, PageBreak
-                from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-                from reportlab.lib.units import inch
-                from reportlab.lib import colors
-                from reportlab.pdfbase import pdfmetrics
-                from reportlab.pdfbase.ttfonts import TTFont
+                rl = _load_reportlab()
             except ImportError:
-                messagebox.showerror("错误", "需要安装reportlab库才能生成PDF报告\n请运行: pip install reportlab")
+                self._show_error("错误", "需要安装reportlab库才能生成PDF报告\n请运行: pip install reportlab")
                 return False
             
-            # 注册中文字体
-            try:
-                # 尝试注册系统中文字体
-                font_paths = [
-                    "C:/Windows/Fonts/msyh.ttc",  # 微软雅黑
-                    "C:/Windows/Fonts/simsun.ttc",  # 宋体
-                    "/System/Library/Fonts/PingFang.ttc",  # macOS
-                    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"  # Linux
-                ]
-                
-                font_registered = False
-                for font_path in font_paths:
-                    if os.path.exists(font_path):
-                        try:
-                            pdfmetrics.registerFont(TTFont('ChineseFont', font_path))
-                            font_registered = True
-                            break
-                        except:
-                            continue
-                
-                if not font_registered:
-                    # 使用默认字体
-                    chinese_font = 'Helvetica'
-                else:
-                    chinese_font = 'ChineseFont'
-                    
-            except Exception as e:
-                logger.warning(f"注册中文字体失败: {e}")
-                chinese_font = 'Helvetica'
+            A4, colors = rl.A4, rl.colors
+            SimpleDocTemplate, Paragraph, Spacer, PageBreak = rl.SimpleDocTemplate, rl.Paragraph, rl.Spacer, rl.PageBreak
+            Table, TableStyle = rl.Table, rl.TableStyle
+            getSampleStyleSheet, ParagraphStyle = rl.getSampleStyleSheet, rl.ParagraphStyle
+            
+            # 注册中文字体（首次解析后缓存）
+            chinese_font = self._get_chinese_font()
+            
+            # 干员表和计算记录表共用的表格样式
+            data_table_style = TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, -1), chinese_font),
+                ('FONTSIZE', (0, 0), (-1, -1), 8),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black)
+            ])
             
             # 创建PDF文档
             doc = SimpleDocTemplate(filename, pagesize=A4)
@@ -199,14 +634,13 @@ class ReportGenerator:
             
             stats_data = [
                 ['统计项目', '数值'],
-                ['干员总数', str(stats.get('total_operators', 0))],
-                ['导入记录总数', str(stats.get('total_imports', 0))],
-                ['计算记录总数', str(stats.get('total_calculations', 0))],
-                ['今日计算次数', str(stats.get('today_calculations', 0))]
+                ['干员总数', str(total_operators)],
+                ['导入记录总数', str(total_imports)],
+                ['计算记录总数', str(total_calcs)],
+                ['今日计算次数', str(today_calcs)]
             ]
             
             # 添加职业分布
-            class_dist = stats.get('class_distribution', {})
             for class_type, count in class_dist.items():
                 stats_data.append([f'{class_type}职业干员', str(count)])
             
@@ -230,7 +664,7 @@ class ReportGenerator:
                 story.append(Paragraph("干员数据 (前20个)", heading_style))
                 
                 operator_data = [['名称', '职业', '攻击力', '生命值', '攻击类型']]
-                for i, op in enumerate(operators[:20]):
+                for i, op in enumerate(islice(operators, 20)):
                     operator_data.append([
                         str(op.get('name', '')),
                         str(op.get('class_type', '')),
@@ -239,19 +673,7 @@ class ReportGenerator:
                         str(op.get('atk_type', ''))
                     ])
                 
-                operator_table = Table(operator_data)
-                operator_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, -1), chinese_font),
-                    ('FONTSIZE', (0, 0), (-1, -1), 8),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                ]))
-                
-                story.append(operator_table)
+                self._add_chunked_table(story, operator_data, data_table_style)
                 story.append(Spacer(1, 20))
             
             # 添加前4次计算结果详情
@@ -302,22 +724,7 @@ class ReportGenerator:
                                     <tbody>
                                 """
                                 
-                                for row in detailed_table:
-                                    html_content += f"""
-                                        <tr style="background-color: #f8f9fa;">
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{row.get('干员名称', '')}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{row.get('职业类型', '')}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{row.get('攻击类型', '')}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{row.get('攻击力', 0)}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{float(row.get('攻击速度', 0)):.1f}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{row.get('生命值', 0)}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{row.get('部署费用', 0)}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{float(row.get('DPS', 0)):.2f}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{float(row.get('DPH', 0)):.2f}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{row.get('破甲线', 0)}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{float(row.get('性价比', 0)):.2f}</td>
-                                        </tr>
-                                    """
+                                html_content += _render_detail_rows(detailed_table)
                                 
                                 html_content += f"""
                                     </tbody>
@@ -389,136 +796,38 @@ class ReportGenerator:
                 story.append(Paragraph("最近计算记录 (前10个)", heading_style))
                 
                 calc_data = [['干员名称', '计算类型', '创建时间']]
-                for i, record in enumerate(calc_records[:10]):
+                for i, record in enumerate(islice(calc_records, 10)):
                     calc_data.append([
                         str(record.get('operator_name', '未知')),
                         str(record.get('calculation_type', '')),
                         str(record.get('created_at', ''))[:19]  # 只显示日期时间部分
                     ])
                 
-                calc_table = Table(calc_data)
-                calc_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, -1), chinese_font),
-                    ('FONTSIZE', (0, 0), (-1, -1), 8),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                ]))
-                
-                story.append(calc_table)
+                self._add_chunked_table(story, calc_data, data_table_style)
             
             # 生成PDF
             doc.build(story)
             
-            messagebox.showinfo("导出成功", f"PDF报告已导出到: {filename}")
+            self._show_info("导出成功", f"PDF报告已导出到: {filename}")
             return True
             
         except Exception as e:
             logger.error(f"生成PDF报告失败: {e}")
-            messagebox.showerror("导出失败", f"生成PDF报告失败：\n{str(e)}")
+            self._show_error("导出失败", f"生成PDF报告失败：\n{str(e)}")
             return False
     
     def generate_html_report(self, filename: str, stats: Dict, operators: List, calc_records: List, recent_calculations: List, current_time: datetime) -> bool:
         """生成HTML报告"""
+        # 先写入临时文件，全部成功后再替换目标文件，失败时不留下不完整的报告
+        temp_filename = filename + '.tmp'
         try:
-            html_content = f"""
-<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>塔防游戏伤害分析器 - 完整分析报告</title>
-    <style>
-        body {{
-            font-family: 'Microsoft YaHei', Arial, sans-serif;
-            line-height: 1.6;
-            margin: 0;
-            padding: 20px;
-            background-color: #f5f5f5;
-        }}
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            background-color: white;
-            padding: 30px;
-            border-radius: 10px;
-            box-shadow: 0 0 20px rgba(0,0,0,0.1);
-        }}
-        h1 {{
-            color: #2c3e50;
-            text-align: center;
-            border-bottom: 3px solid #3498db;
-            padding-bottom: 10px;
-        }}
-        h2 {{
-            color: #34495e;
-            border-left: 4px solid #3498db;
-            padding-left: 15px;
-            margin-top: 30px;
-        }}
-        .meta-info {{
-            background-color: #ecf0f1;
-            padding: 15px;
-            border-radius: 5px;
-            margin-bottom: 20px;
-        }}
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin: 20px 0;
-            background-color: white;
-        }}
-        th, td {{
-            border: 1px solid #ddd;
-            padding: 12px;
-            text-align: left;
-        }}
-        th {{
-            background-color: #3498db;
-            color: white;
-            font-weight: bold;
-        }}
-        tr:nth-child(even) {{
-            background-color: #f9f9f9;
-        }}
-        tr:hover {{
-            background-color: #f5f5f5;
-        }}
-        .stats-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 20px;
-            margin: 20px 0;
-        }}
-        .stat-card {{
-            background-color: #3498db;
-            color: white;
-            padding: 20px;
-            border-radius: 8px;
-            text-align: center;
-        }}
-        .stat-number {{
-            font-size: 2em;
-            font-weight: bold;
-            margin-bottom: 5px;
-        }}
-        .stat-label {{
-            font-size: 0.9em;
-            opacity: 0.9;
-        }}
-        .footer {{
-            text-align: center;
-            margin-top: 40px;
-            padding-top: 20px;
-            border-top: 1px solid #ddd;
-            color: #7f8c8d;
-        }}
-    </style>
-</head>
-<body>
+            total_operators, total_imports, total_calcs, today_calcs, class_dist = _unpack_stats(stats)
+            
+            # 边生成边写入文件，内存中只保留当前片段
+            with open(temp_filename, 'w', encoding='utf-8', newline='', buffering=REPORT_WRITE_BUFFER_SIZE) as f:
+                write = f.write
+                write(_HTML_REPORT_HEAD)
+                write(f"""<body>
     <div class="container">
         <h1>塔防游戏伤害分析器 - 完整分析报告</h1>
         
@@ -529,19 +838,19 @@ class ReportGenerator:
         <h2>📊 统计摘要</h2>
         <div class="stats-grid">
             <div class="stat-card">
-                <div class="stat-number">{stats.get('total_operators', 0)}</div>
+                <div class="stat-number">{total_operators}</div>
                 <div class="stat-label">干员总数</div>
             </div>
             <div class="stat-card">
-                <div class="stat-number">{stats.get('total_imports', 0)}</div>
+                <div class="stat-number">{total_imports}</div>
                 <div class="stat-label">导入记录总数</div>
             </div>
             <div class="stat-card">
-                <div class="stat-number">{stats.get('total_calculations', 0)}</div>
+                <div class="stat-number">{total_calcs}</div>
                 <div class="stat-label">计算记录总数</div>
             </div>
             <div class="stat-card">
-                <div class="stat-number">{stats.get('today_calculations', 0)}</div>
+                <div class="stat-number">{today_calcs}</div>
                 <div class="stat-label">今日计算次数</div>
             </div>
         </div>
@@ -556,22 +865,17 @@ class ReportGenerator:
                 </tr>
             </thead>
             <tbody>
-"""
-            
-            # 添加职业分布数据
-            class_dist = stats.get('class_distribution', {})
-            total_ops = stats.get('total_operators', 1)
-            for class_type, count in class_dist.items():
-                percentage = (count / total_ops * 100) if total_ops > 0 else 0
-                html_content += f"""
-                <tr>
-                    <td>{class_type}</td>
-                    <td>{count}</td>
-                    <td>{percentage:.1f}%</td>
-                </tr>
-"""
-            
-            html_content += """
+""")
+                
+                # 添加职业分布数据
+                # 总数为0时占比全部为0，否则预先算好每个干员对应的百分比
+                inv = 100.0 / total_operators if total_operators > 0 else 0.0
+                write("".join(
+                    _CLASS_ROW_HTML.format(class_type, count, count * inv)
+                    for class_type, count in zip(_esc_cells(class_dist), class_dist.values())
+                ))
+                
+                write("""
             </tbody>
         </table>
         
@@ -588,22 +892,24 @@ class ReportGenerator:
                 </tr>
             </thead>
             <tbody>
-"""
-            
-            # 添加干员数据
-            for op in operators[:20]:
-                html_content += f"""
+""")
+                
+                # 添加干员数据
+                top_ops = operators[:20]
+                op_text = _esc_cells([op.get(key, '') for op in top_ops for key in ('name', 'class_type', 'atk_type')])
+                for op, (name, class_type, atk_type) in zip(top_ops, zip(*[iter(op_text)] * 3)):
+                    write(f"""
                 <tr>
-                    <td>{op.get('name', '')}</td>
-                    <td>{op.get('class_type', '')}</td>
+                    <td>{name}</td>
+                    <td>{class_type}</td>
                     <td>{op.get('atk', 0)}</td>
                     <td>{op.get('hp', 0)}</td>
-                    <td>{op.get('atk_type', '')}</td>
+                    <td>{atk_type}</td>
                     <td>{op.get('cost', 0)}</td>
                 </tr>
-"""
-            
-            html_content += """
+""")
+                
+                write("""
             </tbody>
         </table>
         
@@ -618,32 +924,38 @@ class ReportGenerator:
                 </tr>
             </thead>
             <tbody>
-"""
-            
-            # 添加前4次计算结果详情
-            if recent_calculations:
-                for i, calc in enumerate(recent_calculations, 1):
-                    try:
-                        # 计算基本信息
-                        operator_name = calc.get('operator_name', '未知干员')
-                        calc_type = calc.get('calculation_type', '未知计算')
-                        created_at = str(calc.get('created_at', ''))[:19]
-                        
-                        # 解析参数和结果
-                        parameters = calc.get('parameters', {})
-                        results = calc.get('results', {})
-                        
-                        # 检查是否是多干员对比计算
-                        if '多干员对比' in calc_type and 'detailed_table' in results:
-                            # 显示多干员对比的详细表格
-                            detailed_table = results['detailed_table']
-                            if detailed_table:
-                                html_final = f"""
+""")
+                
+                # 添加前4次计算结果详情
+                if recent_calculations:
+                    for i, calc in enumerate(recent_calculations, 1):
+                        # 每条记录先在本地拼好再写入，解析失败时整条替换为失败行
+                        calc_parts = []
+                        try:
+                            # 计算基本信息
+                            operator_name = calc.get('operator_name', '未知干员')
+                            calc_type = calc.get('calculation_type', '未知计算')
+                            created_at = str(calc.get('created_at', ''))[:19]
+                            
+                            # 解析参数和结果
+                            parameters = calc.get('parameters', {})
+                            results = calc.get('results', {})
+                            
+                            # 检查是否是多干员对比计算
+                            is_comparison = '多干员对比' in calc_type and 'detailed_table' in results
+                            operator_name, calc_type, created_at, calc_mode = _esc_cells(
+                                (operator_name, calc_type, created_at, parameters.get('calc_mode_display', '未知模式')))
+                            
+                            if is_comparison:
+                                # 显示多干员对比的详细表格
+                                detailed_table = results['detailed_table']
+                                if detailed_table:
+                                    calc_parts.append(f"""
                         <tr>
                             <td colspan="4">
                                 <h4>计算 {i}: {calc_type} - {len(detailed_table)}个干员对比</h4>
                                 <p><strong>计算时间:</strong> {created_at}</p>
-                                <p><strong>计算参数:</strong> 敌防{parameters.get('enemy_def', 0)}, 敌法抗{parameters.get('enemy_mdef', 0)}, {parameters.get('calc_mode_display', '未知模式')}</p>
+                                <p><strong>计算参数:</strong> 敌防{parameters.get('enemy_def', 0)}, 敌法抗{parameters.get('enemy_mdef', 0)}, {calc_mode}</p>
                                 
                                 <table style="width: 100%; margin: 10px 0; border-collapse: collapse;">
                                     <thead>
@@ -662,26 +974,11 @@ class ReportGenerator:
                                         </tr>
                                     </thead>
                                     <tbody>
-                                """
-                                
-                                for row in detailed_table:
-                                    html_final += f"""
-                                        <tr style="background-color: #f8f9fa;">
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{row.get('干员名称', '')}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{row.get('职业类型', '')}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{row.get('攻击类型', '')}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{row.get('攻击力', 0)}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{float(row.get('攻击速度', 0)):.1f}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{row.get('生命值', 0)}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{row.get('部署费用', 0)}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{float(row.get('DPS', 0)):.2f}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{float(row.get('DPH', 0)):.2f}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{row.get('破甲线', 0)}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{float(row.get('性价比', 0)):.2f}</td>
-                                        </tr>
-                                    """
-                                
-                                html_final += f"""
+                                """)
+                                    
+                                    calc_parts.append(_render_detail_rows(detailed_table))
+                                    
+                                    calc_parts.append(f"""
                                     </tbody>
                                 </table>
                                 
@@ -690,30 +987,30 @@ class ReportGenerator:
                                 </p>
                             </td>
                         </tr>
-                        """
-                        else:
-                            # 单干员计算的简化显示
-                            # 构建参数字符串
-                            param_details = []
-                            if 'enemy_def' in parameters:
-                                param_details.append(f"敌人防御: {parameters['enemy_def']}")
-                            if 'enemy_mdef' in parameters:
-                                param_details.append(f"敌人法抗: {parameters['enemy_mdef']}")
-                            if 'attack_type' in parameters:
-                                param_details.append(f"攻击类型: {parameters['attack_type']}")
-                            
-                            # 构建结果字符串
-                            result_details = []
-                            if 'dps' in results:
-                                result_details.append(f"DPS: {results['dps']:.2f}")
-                            if 'dph' in results:
-                                result_details.append(f"单发伤害: {results['dph']:.2f}")
-                            if 'total_damage' in results:
-                                result_details.append(f"总伤害: {results['total_damage']:.0f}")
-                            if 'hps' in results:
-                                result_details.append(f"HPS: {results['hps']:.2f}")
-                            
-                            html_final = f"""
+                        """)
+                            else:
+                                # 单干员计算的简化显示
+                                # 构建参数字符串
+                                param_details = []
+                                if 'enemy_def' in parameters:
+                                    param_details.append(f"敌人防御: {parameters['enemy_def']}")
+                                if 'enemy_mdef' in parameters:
+                                    param_details.append(f"敌人法抗: {parameters['enemy_mdef']}")
+                                if 'attack_type' in parameters:
+                                    param_details.append(f"攻击类型: {html.escape(str(parameters['attack_type']))}")
+                                
+                                # 构建结果字符串
+                                result_details = []
+                                if 'dps' in results:
+                                    result_details.append(f"DPS: {results['dps']:.2f}")
+                                if 'dph' in results:
+                                    result_details.append(f"单发伤害: {results['dph']:.2f}")
+                                if 'total_damage' in results:
+                                    result_details.append(f"总伤害: {results['total_damage']:.0f}")
+                                if 'hps' in results:
+                                    result_details.append(f"HPS: {results['hps']:.2f}")
+                                
+                                calc_parts.append(f"""
                         <tr>
                             <td>{i}</td>
                             <td>{operator_name}</td>
@@ -726,20 +1023,22 @@ class ReportGenerator:
                                 <strong>计算结果:</strong> {' | '.join(result_details) if result_details else '无结果信息'}
                             </td>
                         </tr>
-                        """
-                        
-                    except Exception as e:
-                        logger.warning(f"处理计算记录 {i} 失败: {e}")
-                        html_final = f"""
+                        """)
+                            
+                        except Exception as e:
+                            logger.warning(f"处理计算记录 {i} 失败: {e}")
+                            calc_parts = [f"""
                         <tr>
                             <td>{i}</td>
                             <td>数据解析失败</td>
                             <td>数据解析失败</td>
                             <td>数据解析失败</td>
                         </tr>
-                        """
+                        """]
+                        
+                        write("".join(calc_parts))
                 
-                html_final += """
+                write("""
             </tbody>
         </table>
         
@@ -753,19 +1052,21 @@ class ReportGenerator:
                 </tr>
             </thead>
             <tbody>
-"""
-            
-            # 添加计算记录
-            for record in calc_records[:10]:
-                html_final += f"""
+""")
+                
+                # 添加计算记录
+                record_text = _esc_cells([v for record in islice(calc_records, 10) for v in (
+                    record.get('operator_name', '未知'), record.get('calculation_type', ''), str(record.get('created_at', ''))[:19])])
+                for operator_name, calc_type, created_at in zip(*[iter(record_text)] * 3):
+                    write(f"""
                 <tr>
-                    <td>{record.get('operator_name', '未知')}</td>
-                    <td>{record.get('calculation_type', '')}</td>
-                    <td>{str(record.get('created_at', ''))[:19]}</td>
+                    <td>{operator_name}</td>
+                    <td>{calc_type}</td>
+                    <td>{created_at}</td>
                 </tr>
-"""
-            
-            html_final += f"""
+""")
+                
+                write(f"""
             </tbody>
         </table>
         
@@ -775,24 +1076,28 @@ class ReportGenerator:
     </div>
 </body>
 </html>
-"""
+""")
+            os.replace(temp_filename, filename)
             
-            # 写入HTML文件
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(html_final)
-            
-            messagebox.showinfo("导出成功", f"HTML报告已导出到: {filename}")
+            self._show_info("导出成功", f"HTML报告已导出到: {filename}")
             return True
             
         except Exception as e:
             logger.error(f"生成HTML报告失败: {e}")
-            messagebox.showerror("生成失败", f"生成HTML报告失败：\n{str(e)}")
+            try:
+                os.remove(temp_filename)
+            except OSError:
+                pass
+            self._show_error("生成失败", f"生成HTML报告失败：\n{str(e)}")
             return False
     
     def generate_text_report(self, filename: str, stats: Dict, operators: List, calc_records: List, recent_calculations: List, current_time: datetime) -> bool:
         """生成文本报告"""
         try:
-            report_content = f"""
+            total_operators, total_imports, total_calcs, today_calcs, class_dist = _unpack_stats(stats)
+            
+            # 各段文本依次加入列表，最后一次写入文件
+            parts = [f"""
 塔防游戏伤害分析器 - 完整分析报告
 {'='*50}
 
@@ -800,27 +1105,26 @@ class ReportGenerator:
 
 统计摘要
 {'-'*20}
-干员总数: {stats.get('total_operators', 0)}
-导入记录总数: {stats.get('total_imports', 0)}
-计算记录总数: {stats.get('total_calculations', 0)}
-今日计算次数: {stats.get('today_calculations', 0)}
+干员总数: {total_operators}
+导入记录总数: {total_imports}
+计算记录总数: {total_calcs}
+今日计算次数: {today_calcs}
 
 职业分布
 {'-'*20}
-"""
+"""]
             
             # 添加职业分布
-            class_dist = stats.get('class_distribution', {})
             for class_type, count in class_dist.items():
-                report_content += f"{class_type}: {count} 个\n"
+                parts.append(f"{class_type}: {count} 个\n")
             
             # 添加干员数据
-            report_content += f"\n干员数据 (前20个)\n{'-'*20}\n"
-            for i, op in enumerate(operators[:20], 1):
-                report_content += f"{i:2d}. {op.get('name', ''):12s} | {op.get('class_type', ''):8s} | 攻击:{op.get('atk', 0):4d} | 生命:{op.get('hp', 0):4d} | {op.get('atk_type', '')}\n"
+            parts.append(f"\n干员数据 (前20个)\n{'-'*20}\n")
+            for i, op in enumerate(islice(operators, 20), 1):
+                parts.append(f"{i:2d}. {op.get('name', ''):12s} | {op.get('class_type', ''):8s} | 攻击:{op.get('atk', 0):4d} | 生命:{op.get('hp', 0):4d} | {op.get('atk_type', '')}\n")
             
             # 添加前4次计算结果详情
-            report_content += f"\n前4次计算结果详情\n{'-'*20}\n"
+            parts.append(f"\n前4次计算结果详情\n{'-'*20}\n")
             for i, calc in enumerate(recent_calculations, 1):
                 try:
                     # 计算基本信息
@@ -853,31 +1157,31 @@ class ReportGenerator:
                             details.append(f"HPS: {results['hps']:.2f}")
                     
                     detail_str = " | ".join(details) if details else "无详细数据"
-                    report_content += f"计算 {i}: {operator_name} - {calc_type}\n"
-                    report_content += f"时间: {created_at}\n"
-                    report_content += f"详情: {detail_str}\n\n"
+                    parts.append(f"计算 {i}: {operator_name} - {calc_type}\n")
+                    parts.append(f"时间: {created_at}\n")
+                    parts.append(f"详情: {detail_str}\n\n")
                     
                 except Exception as e:
                     logger.warning(f"处理计算记录 {i} 失败: {e}")
-                    report_content += f"计算 {i}: 数据解析失败\n\n"
+                    parts.append(f"计算 {i}: 数据解析失败\n\n")
             
             # 添加计算记录
-            report_content += f"\n最近计算记录 (前10个)\n{'-'*20}\n"
-            for i, record in enumerate(calc_records[:10], 1):
-                report_content += f"{i:2d}. {record.get('operator_name', '未知'):12s} | {record.get('calculation_type', ''):15s} | {str(record.get('created_at', ''))[:19]}\n"
+            parts.append(f"\n最近计算记录 (前10个)\n{'-'*20}\n")
+            for i, record in enumerate(islice(calc_records, 10), 1):
+                parts.append(f"{i:2d}. {record.get('operator_name', '未知'):12s} | {record.get('calculation_type', ''):15s} | {str(record.get('created_at', ''))[:19]}\n")
             
-            report_content += f"\n\n报告结束\n生成时间: {current_time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+            parts.append(f"\n\n报告结束\n生成时间: {current_time.strftime('%Y-%m-%d %H:%M:%S')}\n")
             
             # 写入文本文件
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(report_content)
+            with open(filename, 'w', encoding='utf-8', buffering=REPORT_WRITE_BUFFER_SIZE) as f:
+                f.writelines(parts)
             
-            messagebox.showinfo("导出成功", f"文本报告已导出到: {filename}")
+            self._show_info("导出成功", f"文本报告已导出到: {filename}")
             return True
             
         except Exception as e:
             logger.error(f"生成文本报告失败: {e}")
-            messagebox.showerror("导出失败", f"生成文本报告失败：\n{str(e)}")
+            self._show_error("导出失败", f"生成文本报告失败：\n{str(e)}")
             return False
     
     def generate_complete_analysis_report_with_charts(self, format_type: str, filename: str = None, current_charts: List = None) -> bool:
@@ -938,6 +1242,7 @@ class ReportGenerator:
         chart_paths = []
         
         try:
+            used_paths = set()
             for i, chart_info in enumerate(current_charts):
                 try:
                     figure = chart_info.get('figure')
@@ -947,9 +1252,13 @@ class ReportGenerator:
                         # 清理文件名中的非法字符
                         safe_title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).rstrip()
                         chart_path = f"{base_filename}_{safe_title}.png"
+                        # 标题重复时追加序号，避免后保存的图表覆盖前一个
+                        if chart_path in used_paths:
+                            chart_path = f"{base_filename}_{safe_title}_{i+1}.png"
+                        used_paths.add(chart_path)
                         
-                        # 保存图表
-                        figure.savefig(chart_path, dpi=300, bbox_inches='tight', facecolor='white')
+                        # 保存图表（图表属于界面，matplotlib非线程安全，逐个保存）
+                        figure.savefig(chart_path, **CHART_SAVEFIG_OPTIONS)
                         chart_paths.append(chart_path)
                         
                         logger.info(f"已保存图表: {chart_path}")
@@ -965,55 +1274,16 @@ class ReportGenerator:
     def generate_pdf_report_with_charts(self, filename: str, stats: Dict, operators: List, calc_records: List, recent_calculations: List, timestamp: datetime, chart_paths: List[str] = None) -> bool:
         """生成包含图表的PDF报告"""
         try:
-            from reportlab.lib.pagesizes import A4
-            from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, PageBreak
-            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-            from reportlab.lib import colors
-            from reportlab.lib.units import inch
-            from reportlab.pdfbase import pdfmetrics
-            from reportlab.pdfbase.ttfonts import TTFont
+            total_operators, total_imports, total_calcs, today_calcs, class_dist = _unpack_stats(stats)
             
-            # 注册中文字体 - 修复版本
-            chinese_font = 'Helvetica'  # 默认字体
-            try:
-                # 尝试注册系统中文字体
-                font_paths = [
-                    "C:/Windows/Fonts/msyh.ttc",      # 微软雅黑
-                    "C:/Windows/Fonts/simsun.ttc",    # 宋体
-                    "C:/Windows/Fonts/simhei.ttf",    # 黑体
-                    "/System/Library/Fonts/PingFang.ttc",  # macOS
-                    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"  # Linux
-                ]
-                
-                font_registered = False
-                for font_path in font_paths:
-                    if os.path.exists(font_path):
-                        try:
-                            # 对于TTC字体文件，需要指定子字体
-                            if font_path.endswith('.ttc'):
-                                # 微软雅黑和宋体是TTC文件，需要特殊处理
-                                if 'msyh' in font_path:
-                                    pdfmetrics.registerFont(TTFont('ChineseFont', font_path, subfontIndex=0))
-                                elif 'simsun' in font_path:
-                                    pdfmetrics.registerFont(TTFont('ChineseFont', font_path, subfontIndex=0))
-                                else:
-                                    pdfmetrics.registerFont(TTFont('ChineseFont', font_path))
-                            else:
-                                pdfmetrics.registerFont(TTFont('ChineseFont', font_path))
-                            
-                            chinese_font = 'ChineseFont'
-                            font_registered = True
-                            logger.info(f"成功注册中文字体: {font_path}")
-                            break
-                        except Exception as font_error:
-                            logger.debug(f"注册字体 {font_path} 失败: {font_error}")
-                            continue
-                
-                if not font_registered:
-                    logger.warning("无法注册中文字体，将使用默认字体")
-                    
-            except Exception as e:
-                logger.warning(f"注册中文字体过程失败: {e}")
+            rl = _load_reportlab()
+            A4, colors, inch = rl.A4, rl.colors, rl.inch
+            SimpleDocTemplate, Paragraph, Spacer, Image, PageBreak = rl.SimpleDocTemplate, rl.Paragraph, rl.Spacer, rl.Image, rl.PageBreak
+            Table, TableStyle = rl.Table, rl.TableStyle
+            getSampleStyleSheet, ParagraphStyle = rl.getSampleStyleSheet, rl.ParagraphStyle
+            
+            # 注册中文字体（首次解析后缓存）
+            chinese_font = self._get_chinese_font()
             
             # 创建PDF文档
             doc = SimpleDocTemplate(filename, pagesize=A4)
@@ -1061,14 +1331,13 @@ class ReportGenerator:
             story.append(Paragraph("统计摘要", heading_style))
             stats_data = [
                 ['项目', '数值'],
-                ['干员总数', str(stats.get('total_operators', 0))],
-                ['导入记录', str(stats.get('total_imports', 0))],
-                ['计算记录', str(stats.get('total_calculations', 0))],
-                ['今日计算', str(stats.get('today_calculations', 0))]
+                ['干员总数', str(total_operators)],
+                ['导入记录', str(total_imports)],
+                ['计算记录', str(total_calcs)],
+                ['今日计算', str(today_calcs)]
             ]
             
             # 添加职业分布统计
-            class_dist = stats.get('class_distribution', {})
             for class_type, count in class_dist.items():
                 stats_data.append([f'{class_type}职业', str(count)])
             
@@ -1093,38 +1362,18 @@ class ReportGenerator:
                 story.append(Paragraph("以下图表来自用户在图表对比面板中实际生成的分析结果", normal_style))
                 story.append(Spacer(1, 10))
                 
-                for i, chart_path in enumerate(chart_paths):
-                    if os.path.exists(chart_path):
+                # 一次性读取所有图表的显示尺寸（最大6x4英寸，保持宽高比），不存在的文件为None
+                display_sizes = [_fit_image_size(path, 6 * inch, 4 * inch) if os.path.exists(path) else None
+                                 for path in chart_paths]
+                
+                for i, (chart_path, display_size) in enumerate(zip(chart_paths, display_sizes)):
+                    if display_size is not None:
                         try:
                             chart_name = os.path.basename(chart_path).replace('.png', '')
                             story.append(Paragraph(f"图表 {i+1}: {chart_name}", heading_style))
                             
-                            # 调整图片大小适合页面，保持宽高比
-                            try:
-                                # 读取图片尺寸
-                                from PIL import Image as PILImage
-                                with PILImage.open(chart_path) as pil_img:
-                                    img_width, img_height = pil_img.size
-                                    
-                                # 计算合适的显示尺寸（最大宽度6英寸）
-                                max_width = 6 * inch
-                                max_height = 4 * inch
-                                
-                                # 保持宽高比
-                                scale = min(max_width / img_width, max_height / img_height)
-                                display_width = img_width * scale
-                                display_height = img_height * scale
-                                
-                            except ImportError:
-                                # 如果没有PIL，使用默认尺寸
-                                display_width = 6 * inch
-                                display_height = 4 * inch
-                            except Exception as e:
-                                logger.warning(f"读取图片尺寸失败: {e}")
-                                display_width = 6 * inch
-                                display_height = 4 * inch
-                            
                             # 插入图片
+                            display_width, display_height = display_size
                             img = Image(chart_path, width=display_width, height=display_height)
                             story.append(img)
                             story.append(Spacer(1, 15))
@@ -1215,8 +1464,7 @@ class ReportGenerator:
                                     table_data.append(['...', '...', '...', '...', '...'])
                                     table_data.append(['', f"共 {len(detailed_table)} 个干员", '', '', ''])
                                 
-                                calc_table = Table(table_data)
-                                calc_table.setStyle(TableStyle([
+                                self._add_chunked_table(story, table_data, TableStyle([
                                     ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
                                     ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
                                     ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
@@ -1227,7 +1475,6 @@ class ReportGenerator:
                                     ('BACKGROUND', (0, 1), (-1, -1), colors.white),
                                     ('GRID', (0, 0), (-1, -1), 1, colors.black)
                                 ]))
-                                story.append(calc_table)
                         else:
                             # 单干员计算结果
                             result_info = []
@@ -1271,7 +1518,7 @@ class ReportGenerator:
                 
                 # 构建表格数据
                 table_data = [['干员名称', '职业类型', '攻击力', '生命值', '攻击类型']]
-                display_operators = operators[:20]  # 只显示前20个干员
+                display_operators = islice(operators, 20)  # 只显示前20个干员
                 
                 for op in display_operators:
                     table_data.append([
@@ -1286,8 +1533,7 @@ class ReportGenerator:
                     table_data.append(['...', '...', '...', '...', '...'])
                     table_data.append(['', f"共 {len(operators)} 个干员", '', '', ''])
                 
-                operators_table = Table(table_data)
-                operators_table.setStyle(TableStyle([
+                self._add_chunked_table(story, table_data, TableStyle([
                     ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
                     ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
                     ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
@@ -1298,7 +1544,6 @@ class ReportGenerator:
                     ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
                     ('GRID', (0, 0), (-1, -1), 1, colors.black)
                 ]))
-                story.append(operators_table)
                 story.append(Spacer(1, 20))
             
             # 生成PDF
@@ -1317,6 +1562,8 @@ class ReportGenerator:
     def generate_html_report_with_charts(self, filename: str, stats: Dict, operators: List, calc_records: List, recent_calculations: List, timestamp: datetime, chart_paths: List[str] = None) -> bool:
         """生成包含图表的HTML报告"""
         try:
+            total_operators, total_imports, total_calcs, today_calcs, class_dist = _unpack_stats(stats)
+            
             import base64
             
             html_content = """<!DOCTYPE html>
@@ -1386,10 +1633,9 @@ class ReportGenerator:
 """
             
             # 生成图表部分
-            charts_section = ""
             if chart_paths:
-                charts_section = f"<h2>📈 用户生成的分析图表 (共{len(chart_paths)}个)</h2>"
-                charts_section += "<p class='chart-description'>以下图表来自用户在图表对比面板中实际生成的分析结果</p>"
+                chart_parts = [f"<h2>📈 用户生成的分析图表 (共{len(chart_paths)}个)</h2>",
+                               "<p class='chart-description'>以下图表来自用户在图表对比面板中实际生成的分析结果</p>"]
                 
                 for i, chart_path in enumerate(chart_paths, 1):
                     if os.path.exists(chart_path):
@@ -1397,22 +1643,23 @@ class ReportGenerator:
                             # 将图片转换为base64编码内嵌到HTML中
                             with open(chart_path, 'rb') as img_file:
                                 img_data = base64.b64encode(img_file.read()).decode()
-                                chart_name = os.path.basename(chart_path).replace('.png', '')
-                                charts_section += f"""
+                                chart_name = html.escape(os.path.basename(chart_path).replace('.png', ''))
+                                chart_parts.append(f"""
                                 <div class="chart-section">
                                     <h3>图表 {i}: {chart_name}</h3>
                                     <img src="data:image/png;base64,{img_data}" class="chart-image" alt="{chart_name}">
                                     <p class="chart-description">用户在图表对比面板中生成的分析图表</p>
                                 </div>
-                                """
+                                """)
                         except Exception as e:
                             logger.warning(f"处理图表 {chart_path} 失败: {e}")
-                            charts_section += f"""
+                            chart_parts.append(f"""
                             <div class="chart-section">
                                 <h3>图表 {i}: 加载失败</h3>
-                                <p>图表文件 {os.path.basename(chart_path)} 无法加载</p>
+                                <p>图表文件 {html.escape(os.path.basename(chart_path))} 无法加载</p>
                             </div>
-                            """
+                            """)
+                charts_section = "".join(chart_parts)
             else:
                 # 如果没有用户生成的图表，显示提示
                 charts_section = """
@@ -1431,33 +1678,38 @@ class ReportGenerator:
                 """
             
             # 生成干员数据行
-            operator_rows = ""
-            for op in operators[:20]:  # 限制显示前20个
-                operator_rows += f"""
+            operator_parts = []
+            top_ops = operators[:20]  # 限制显示前20个
+            op_text = _esc_cells([op.get(key, '') for op in top_ops for key in ('name', 'class_type')])
+            for op, (name, class_type) in zip(top_ops, zip(*[iter(op_text)] * 2)):
+                operator_parts.append(f"""
                 <tr>
-                    <td>{op.get('name', '')}</td>
-                    <td>{op.get('class_type', '')}</td>
+                    <td>{name}</td>
+                    <td>{class_type}</td>
                     <td>{op.get('atk', 0)}</td>
                     <td>{op.get('hp', 0)}</td>
                     <td>{op.get('def', 0)}</td>
                     <td>{op.get('cost', 0)}</td>
                 </tr>
-                """
+                """)
+            operator_rows = "".join(operator_parts)
             
-            # 填充模板
-            html_final = html_content.format(
+            # 填充模板，之后的各段HTML依次加入列表，最后一次写入文件
+            parts = [html_content.format(
                 timestamp=timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-                total_operators=stats.get('total_operators', 0),
-                total_imports=stats.get('total_imports', 0),
-                total_calculations=stats.get('total_calculations', 0),
-                today_calculations=stats.get('today_calculations', 0),
+                total_operators=total_operators,
+                total_imports=total_imports,
+                total_calculations=total_calcs,
+                today_calculations=today_calcs,
                 charts_section=charts_section,
                 operator_rows=operator_rows
-            )
+            )]
             
             # 添加前4次计算结果详情
             if recent_calculations:
                 for i, calc in enumerate(recent_calculations, 1):
+                    # 解析失败时丢弃该条记录已生成的片段
+                    mark = len(parts)
                     try:
                         # 计算基本信息
                         operator_name = calc.get('operator_name', '未知干员')
@@ -1469,16 +1721,20 @@ class ReportGenerator:
                         results = calc.get('results', {})
                         
                         # 检查是否是多干员对比计算
-                        if '多干员对比' in calc_type and 'detailed_table' in results:
+                        is_comparison = '多干员对比' in calc_type and 'detailed_table' in results
+                        operator_name, calc_type, created_at, calc_mode = _esc_cells(
+                            (operator_name, calc_type, created_at, parameters.get('calc_mode_display', '未知模式')))
+                        
+                        if is_comparison:
                             # 显示多干员对比的详细表格
                             detailed_table = results['detailed_table']
                             if detailed_table:
-                                html_final += f"""
+                                parts.append(f"""
                         <tr>
                             <td colspan="4">
                                 <h4>计算 {i}: {calc_type} - {len(detailed_table)}个干员对比</h4>
                                 <p><strong>计算时间:</strong> {created_at}</p>
-                                <p><strong>计算参数:</strong> 敌防{parameters.get('enemy_def', 0)}, 敌法抗{parameters.get('enemy_mdef', 0)}, {parameters.get('calc_mode_display', '未知模式')}</p>
+                                <p><strong>计算参数:</strong> 敌防{parameters.get('enemy_def', 0)}, 敌法抗{parameters.get('enemy_mdef', 0)}, {calc_mode}</p>
                                 
                                 <table style="width: 100%; margin: 10px 0; border-collapse: collapse;">
                                     <thead>
@@ -1497,26 +1753,11 @@ class ReportGenerator:
                                         </tr>
                                     </thead>
                                     <tbody>
-                                """
+                                """)
                                 
-                                for row in detailed_table:
-                                    html_final += f"""
-                                        <tr style="background-color: #f8f9fa;">
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{row.get('干员名称', '')}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{row.get('职业类型', '')}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{row.get('攻击类型', '')}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{row.get('攻击力', 0)}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{float(row.get('攻击速度', 0)):.1f}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{row.get('生命值', 0)}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{row.get('部署费用', 0)}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{float(row.get('DPS', 0)):.2f}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{float(row.get('DPH', 0)):.2f}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{row.get('破甲线', 0)}</td>
-                                            <td style="border: 1px solid #ddd; padding: 6px; font-size: 11px;">{float(row.get('性价比', 0)):.2f}</td>
-                                        </tr>
-                                    """
+                                parts.append(_render_detail_rows(detailed_table))
                                 
-                                html_final += f"""
+                                parts.append(f"""
                                     </tbody>
                                 </table>
                                 
@@ -1525,7 +1766,7 @@ class ReportGenerator:
                                 </p>
                             </td>
                         </tr>
-                        """
+                        """)
                         else:
                             # 单干员计算的简化显示
                             # 构建参数字符串
@@ -1535,7 +1776,7 @@ class ReportGenerator:
                             if 'enemy_mdef' in parameters:
                                 param_details.append(f"敌人法抗: {parameters['enemy_mdef']}")
                             if 'attack_type' in parameters:
-                                param_details.append(f"攻击类型: {parameters['attack_type']}")
+                                param_details.append(f"攻击类型: {html.escape(str(parameters['attack_type']))}")
                             
                             # 构建结果字符串
                             result_details = []
@@ -1548,7 +1789,7 @@ class ReportGenerator:
                             if 'hps' in results:
                                 result_details.append(f"HPS: {results['hps']:.2f}")
                             
-                            html_final += f"""
+                            parts.append(f"""
                         <tr>
                             <td>{i}</td>
                             <td>{operator_name}</td>
@@ -1561,20 +1802,21 @@ class ReportGenerator:
                                 <strong>计算结果:</strong> {' | '.join(result_details) if result_details else '无结果信息'}
                             </td>
                         </tr>
-                        """
+                        """)
                         
                     except Exception as e:
                         logger.warning(f"处理计算记录 {i} 失败: {e}")
-                        html_final += f"""
+                        del parts[mark:]
+                        parts.append(f"""
                         <tr>
                             <td>{i}</td>
                             <td>数据解析失败</td>
                             <td>数据解析失败</td>
                             <td>数据解析失败</td>
                         </tr>
-                        """
+                        """)
             
-            html_final += """
+            parts.append("""
             </tbody>
         </table>
         
@@ -1588,19 +1830,21 @@ class ReportGenerator:
                 </tr>
             </thead>
             <tbody>
-"""
+""")
             
             # 添加计算记录
-            for record in calc_records[:10]:
-                html_final += f"""
+            record_text = _esc_cells([v for record in islice(calc_records, 10) for v in (
+                record.get('operator_name', '未知'), record.get('calculation_type', ''), str(record.get('created_at', ''))[:19])])
+            for operator_name, calc_type, created_at in zip(*[iter(record_text)] * 3):
+                parts.append(f"""
                 <tr>
-                    <td>{record.get('operator_name', '未知')}</td>
-                    <td>{record.get('calculation_type', '')}</td>
-                    <td>{str(record.get('created_at', ''))[:19]}</td>
+                    <td>{operator_name}</td>
+                    <td>{calc_type}</td>
+                    <td>{created_at}</td>
                 </tr>
-"""
+""")
             
-            html_final += f"""
+            parts.append(f"""
             </tbody>
         </table>
         
@@ -1610,11 +1854,11 @@ class ReportGenerator:
     </div>
 </body>
 </html>
-"""
+""")
             
             # 写入HTML文件
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(html_final)
+            with open(filename, 'w', encoding='utf-8', newline='', buffering=REPORT_WRITE_BUFFER_SIZE) as f:
+                f.writelines(parts)
             
             chart_info = f"包含 {len(chart_paths)} 个用户生成的图表" if chart_paths else "未包含图表（用户未生成图表）"
             messagebox.showinfo("导出成功", f"HTML报告已导出到: {filename}\n{chart_info}")